@@ -3,3 +3,18 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from api_yamdb.database import (
+            apply_pragmas, close_unusable_connections,
+        )
+        from . import signals  # noqa: F401
+
+        request_started.connect(
+            close_unusable_connections,
+            dispatch_uid='close_unusable_connections')
+        connection_created.connect(
+            apply_pragmas, dispatch_uid='apply_pragmas')
@@ -0,0 +1,214 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from jwt.algorithms import get_default_algorithms
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import TokenUser, User
+
+VERSION_CLAIM = 'ver'
+CLAIMS = User.TOKEN_CLAIMS
+
+# Версия удалённого или заблокированного пользователя: с ней не совпадёт
+# ни один выданный токен.
+REVOKED = -1
+
+
+def get_cache():
+    return caches[settings.TOKEN_CLAIMS['CACHE_ALIAS']]
+
+
+def version_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def current_version(user):
+    return user.token_version if user.is_active else REVOKED
+
+
+def remember_version(user_id, version):
+    get_cache().set(
+        version_key(user_id), version,
+        settings.TOKEN_CLAIMS['VERSION_CACHE_TIMEOUT'])
+
+
+def get_version(user_id):
+    """
+    Текущая версия токенов пользователя: из кэша, а при промахе —
+    одним узким запросом без загрузки строки пользователя целиком.
+    """
+    version = get_cache().get(version_key(user_id))
+    if version is None:
+        row = User.objects.filter(pk=user_id).values_list(
+            'token_version', 'is_active').first()
+        version = REVOKED if row is None or not row[1] else row[0]
+        remember_version(user_id, version)
+    return version
+
+
+def token_for_user(user):
+    """
+    Access-токен пользователя. В режиме TOKEN_CLAIMS в него записываются
+    роль, is_staff, имя и версия токенов: права проверяются по токену,
+    а смена роли или блокировка меняют версию и отзывают старые токены.
+    """
+    token = AccessToken.for_user(user)
+    if settings.TOKEN_CLAIMS['ENABLED']:
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def token_user(user_id, claims):
+    """
+    Пользователь, собранный из утверждений токена, без чтения базы.
+    Сохранить его нельзя (см. TokenUser).
+    """
+    user = TokenUser(id=user_id, **claims)
+    user._state.adding = False
+    user._state.db = 'default'
+    user.from_token = True
+    return user
+
+
+class PreparedKeyTokenBackend(TokenBackend):
+    """
+    TokenBackend, который разбирает ключ проверки подписи один раз:
+    PyJWT готовит ключ при каждом decode, а для RS/ES это разбор PEM.
+    """
+    prepared_key = None
+
+    def get_verifying_key(self, token):
+        if self.jwks_client:
+            return super().get_verifying_key(token)
+        if self.prepared_key is None:
+            self.prepared_key = get_default_algorithms()[
+                self.algorithm].prepare_key(
+                    super().get_verifying_key(token))
+        return self.prepared_key
+
+
+class PreparedKeyAccessToken(AccessToken):
+    token_backend = PreparedKeyTokenBackend(
+        api_settings.ALGORITHM,
+        api_settings.SIGNING_KEY,
+        api_settings.VERIFYING_KEY,
+        api_settings.AUDIENCE,
+        api_settings.ISSUER,
+        api_settings.JWK_URL,
+        api_settings.LEEWAY,
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Собирает request.user из утверждений токена, не читая таблицу
+    пользователей. Токены без версии (выданные до включения режима)
+    проверяются по базе, как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.')
+        if validated_token[VERSION_CLAIM] != get_version(user_id):
+            raise InvalidToken('Токен отозван.')
+        return token_user(
+            user_id, {claim: validated_token[claim] for claim in CLAIMS})
+
+
+class TokenCache:
+    """
+    LRU проверенных токенов процесса: сырой токен -> снимок пользователя
+    (id, утверждения, версия токенов) и момент, до которого запись
+    действительна. Размер ограничен `max_size`, запись живёт не дольше
+    срока токена и `ttl`.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self.entries[raw_token]
+                return None
+            self.entries.move_to_end(raw_token)
+            return entry
+
+    def set(self, raw_token, expires_at, *snapshot):
+        expires_at = min(expires_at, time.time() + self.ttl)
+        with self.lock:
+            self.entries[raw_token] = (expires_at, *snapshot)
+            self.entries.move_to_end(raw_token)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, raw_token):
+        with self.lock:
+            self.entries.pop(raw_token, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE['MAX_SIZE'],
+    settings.AUTH_TOKEN_CACHE['TTL'].total_seconds(),
+)
+
+
+class CachedJWTAuthentication(ClaimsJWTAuthentication):
+    """
+    Повторный запрос с тем же токеном не проверяет подпись и не читает
+    пользователя: снимок берётся из LRU процесса. Отзыв по-прежнему
+    проверяется по версии токенов пользователя.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        entry = token_cache.get(raw_token)
+        if entry is not None:
+            _, validated_token, user_id, claims, version = entry
+            if version == get_version(user_id):
+                return token_user(user_id, claims), validated_token
+            token_cache.discard(raw_token)
+            if VERSION_CLAIM in validated_token:
+                raise InvalidToken('Токен отозван.')
+            # Токен без версии не отзывается сменой роли: устарел только
+            # снимок пользователя, его перечитываем из базы.
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        claims = {claim: getattr(user, claim) for claim in CLAIMS}
+        version = validated_token.get(VERSION_CLAIM, user.token_version)
+        token_cache.set(
+            raw_token, validated_token['exp'],
+            validated_token, user.pk, claims, version)
+        return user, validated_token
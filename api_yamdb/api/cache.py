@@ -0,0 +1,165 @@
+from functools import wraps
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import db_routers
+from reviews.models import CatalogueVersion
+
+KEY_PREFIX = 'catalogue'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+# Пространство, которое входит в ключ любого ответа: его смена
+# сбрасывает весь кэш каталога (например, после import_csv).
+EPOCH = 'epoch'
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE['ALIAS']]
+
+
+def version_key(name):
+    return f'{KEY_PREFIX}:version:{name}'
+
+
+def get_versions(names):
+    """
+    Текущие версии пространств. Отсутствующая (или вытесненная) версия
+    заменяется новым случайным значением, поэтому старые ответы
+    не могут случайно совпасть с новым ключом.
+    """
+    cache = get_cache()
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_stored_versions(names):
+    """
+    Версии пространств из базы: по ним строится ETag, когда кэш ответов
+    выключен. Пространство, которое ещё не менялось, имеет версию ''.
+    """
+    # Версии читаются из основной базы: на отстающей реплике они
+    # совпали бы с устаревшим ETag клиента.
+    stored = dict(CatalogueVersion.objects.using('default').filter(
+        name__in=names).values_list('name', 'version'))
+    return [stored.get(name, '') for name in names]
+
+
+def store_versions(names):
+    version = uuid4().hex
+    CatalogueVersion.objects.filter(name__in=names).update(version=version)
+    CatalogueVersion.objects.bulk_create(
+        [CatalogueVersion(name=name, version=version) for name in names],
+        ignore_conflicts=True)
+
+
+def invalidate(*names):
+    get_cache().set_many(
+        {version_key(name): uuid4().hex for name in names}, None)
+    # Версии в базе меняются всегда: иначе после выключения кэша
+    # клиент получил бы 304 на ETag, выданный до изменения.
+    store_versions(names)
+
+
+def invalidate_all():
+    invalidate(EPOCH)
+
+
+def increment(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    stats = get_cache().get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def response_key(request, versions):
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = '|'.join(
+        [request.get_host(), request.path, query, *versions])
+    return f'{KEY_PREFIX}:response:{md5(raw.encode()).hexdigest()}'
+
+
+def key_etag(key):
+    return quote_etag(key.rsplit(':', 1)[-1])
+
+
+def etag_matches(request, etag):
+    return etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def not_modified(etag):
+    return Response(
+        status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def cache_response(view_method):
+    """
+    Кэширует данные ответа действия list/retrieve. Ключ строится из пути,
+    упорядоченных параметров запроса и версий пространств, от которых
+    зависит ответ (`get_cache_dependencies` вьюсета); запись в модели
+    меняет версию нужного пространства, и старые ключи больше не читаются.
+    Тот же ключ служит ETag: на совпавший If-None-Match отвечаем 304,
+    не обращаясь ни к базе, ни к сериализатору. Без кэша ETag строится
+    так же, но по версиям из базы (один запрос вместо ответа целиком).
+
+    Ответ, прочитанный с реплики, не кэшируется и не получает ETag:
+    сброс кэша идёт сразу после записи в основную базу, и отстающая
+    реплика заполнила бы новый ключ данными до записи.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        names = (EPOCH, *self.get_cache_dependencies())
+        if not settings.CATALOGUE_CACHE['ENABLED']:
+            etag = key_etag(response_key(request, get_stored_versions(names)))
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            response = view_method(self, request, *args, **kwargs)
+            if (response.status_code == status.HTTP_200_OK
+                    and not db_routers.reading_from_replica()):
+                response['ETag'] = etag
+            return response
+        cache = get_cache()
+        key = response_key(request, get_versions(names))
+        etag = key_etag(key)
+        if etag_matches(request, etag):
+            increment(HITS_KEY)
+            return not_modified(etag)
+        data = cache.get(key)
+        if data is not None:
+            increment(HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT', 'ETag': etag})
+        increment(MISSES_KEY)
+        response = view_method(self, request, *args, **kwargs)
+        if (response.status_code == status.HTTP_200_OK
+                and not db_routers.reading_from_replica()):
+            cache.set(key, response.data, settings.CATALOGUE_CACHE['TIMEOUT'])
+            response['ETag'] = etag
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
@@ -0,0 +1,67 @@
+import random
+from threading import local
+
+from django.conf import settings
+
+state = local()
+
+
+def enabled():
+    return bool(settings.DATABASE_READ_ALIASES)
+
+
+def read_from_replica(enabled):
+    """Включает чтение с реплик для текущего запроса (потока)."""
+    state.replica = enabled
+
+
+def reading_from_replica():
+    """Чтения текущего запроса идут на реплики."""
+    return getattr(state, 'replica', False) and enabled()
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_READ_ALIASES)
+
+
+def is_sticky(request):
+    """Клиент недавно писал и должен читать из основной базы."""
+    return settings.DATABASE_STICKY['COOKIE'] in request.COOKIES
+
+
+def stick(response):
+    """
+    Read-your-writes: после записи клиент DATABASE_STICKY['SECONDS']
+    секунд читает из основной базы, пока реплики догоняют её.
+    """
+    response.set_cookie(
+        settings.DATABASE_STICKY['COOKIE'], '1',
+        max_age=settings.DATABASE_STICKY['SECONDS'],
+        httponly=True, samesite='Lax')
+
+
+class ReplicaRouter:
+    """
+    Чтение с DATABASE_READ_ALIASES для безопасных действий вьюсетов
+    каталога, отзывов и комментариев (см. ReplicaReadMixin); всё
+    остальное — и любые записи — идёт в default. Без алиасов для чтения
+    ничего не меняется.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return choose_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На всех алиасах одни и те же данные.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
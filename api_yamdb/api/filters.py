@@ -1,25 +1,21 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(field_name='genre__slug')
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    year = filters.CharFilter(
-        field_name='year',
-        lookup_expr='icontains'
-    )
+    year = filters.NumberFilter(field_name='year')
+    search = filters.CharFilter(method='filter_search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'search')
@@ -0,0 +1,143 @@
+import time
+from bisect import bisect_left
+from threading import Lock, local
+
+from django.conf import settings
+
+# Счётчики на одну пару (route, action), суммируются по запросам.
+COUNTERS = (
+    ('requests_total', 'Число запросов.'),
+    ('request_seconds_total', 'Суммарное время обработки, с.'),
+    ('sql_queries_total', 'Число SQL-запросов.'),
+    ('sql_seconds_total', 'Суммарное время SQL-запросов, с.'),
+    ('serializer_seconds_total', 'Суммарное время сериализации, с.'),
+    ('response_bytes_total', 'Суммарный размер ответов, байт.'),
+)
+PREFIX = 'yamdb_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_current = local()
+
+
+class Registry:
+    """
+    Метрики процесса: счётчики и гистограмма времени ответа для каждой
+    пары (URL name, действие вьюсета). При нескольких процессах у каждого
+    свой реестр.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.lock = Lock()
+        self.series = {}
+
+    def observe(self, route, action, sample):
+        with self.lock:
+            series = self.series.setdefault((route, action), {
+                'counters': dict.fromkeys(
+                    (name for name, _ in COUNTERS), 0),
+                'buckets': [0] * len(self.buckets),
+            })
+            counters = series['counters']
+            counters['requests_total'] += 1
+            for name, value in sample.items():
+                counters[name] += value
+            index = bisect_left(self.buckets, sample['request_seconds_total'])
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self):
+        """Текстовый формат Prometheus."""
+        with self.lock:
+            series = {
+                key: {'counters': dict(value['counters']),
+                      'buckets': list(value['buckets'])}
+                for key, value in sorted(self.series.items())
+            }
+        lines = []
+        for name, help_text in COUNTERS:
+            lines.append(f'# HELP {PREFIX}{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}{name} counter')
+            for (route, action), value in series.items():
+                lines.append(f'{PREFIX}{name}{labels(route, action)} '
+                             f'{value["counters"][name]}')
+        name = f'{PREFIX}request_duration_seconds'
+        lines.append(f'# HELP {name} Время обработки запроса, с.')
+        lines.append(f'# TYPE {name} histogram')
+        for (route, action), value in series.items():
+            total = 0
+            for bound, count in zip(self.buckets, value['buckets']):
+                total += count
+                lines.append(f'{name}_bucket'
+                             f'{labels(route, action, le=bound)} {total}')
+            counters = value['counters']
+            lines.append(f'{name}_bucket{labels(route, action, le="+Inf")} '
+                         f'{counters["requests_total"]}')
+            lines.append(f'{name}_sum{labels(route, action)} '
+                         f'{counters["request_seconds_total"]}')
+            lines.append(f'{name}_count{labels(route, action)} '
+                         f'{counters["requests_total"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def labels(route, action, **extra):
+    pairs = {'route': route, 'action': action, **extra}
+    return '{' + ','.join(
+        f'{key}="{value}"' for key, value in pairs.items()) + '}'
+
+
+registry = Registry(settings.METRICS['BUCKETS'])
+
+
+def start_request():
+    _current.sample = dict.fromkeys(
+        (name for name, _ in COUNTERS if name != 'requests_total'), 0)
+    return _current.sample
+
+
+def finish_request():
+    sample = getattr(_current, 'sample', None)
+    _current.sample = None
+    return sample
+
+
+def add(name, value):
+    sample = getattr(_current, 'sample', None)
+    if sample is not None:
+        sample[name] += value
+
+
+def count_query(execute, sql, params, many, context):
+    """execute_wrapper: число и время SQL-запросов текущего запроса."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        add('sql_queries_total', 1)
+        add('sql_seconds_total', time.perf_counter() - started)
+
+
+def timed_serializer(serializer):
+    """
+    Замер сериализации: оборачивает to_representation только этого
+    экземпляра. Вложенные сериализаторы и элементы списка — другие
+    экземпляры, поэтому время не считается дважды. Вне запроса
+    с метриками сериализатор возвращается как есть.
+    """
+    if getattr(_current, 'sample', None) is None:
+        return serializer
+    to_representation = serializer.to_representation
+
+    def timed(instance):
+        started = time.perf_counter()
+        try:
+            return to_representation(instance)
+        finally:
+            add('serializer_seconds_total', time.perf_counter() - started)
+
+    serializer.to_representation = timed
+    return serializer
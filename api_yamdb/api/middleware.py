@@ -0,0 +1,101 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, slow_queries
+
+logger = logging.getLogger('api.metrics')
+
+
+def resolve_route(request):
+    """URL name и действие вьюсета (для APIView — HTTP-метод)."""
+    match = request.resolver_match
+    if match is None:
+        return 'unresolved', request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        match.url_name or match.view_name or 'unnamed',
+        actions.get(request.method.lower(), request.method.lower())
+    )
+
+
+class MetricsMiddleware:
+    """
+    Для каждого запроса записывает в реестр метрик время обработки,
+    число и время SQL-запросов, время сериализации (его замеряют
+    представления, см. SerializerMetricsMixin) и размер ответа и пишет
+    их структурированной строкой в лог `api.metrics`.
+    Если METRICS['ENABLED'] выключен, Django исключает middleware
+    из цепочки при старте, и накладных расходов нет.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.count_query))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request()
+        sample['request_seconds_total'] = time.perf_counter() - started
+        if not response.streaming:
+            sample['response_bytes_total'] = len(response.content)
+        route, action = resolve_route(request)
+        metrics.registry.observe(route, action, sample)
+        logger.info(json.dumps({
+            'route': route,
+            'action': action,
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round(sample['request_seconds_total'] * 1000, 3),
+            'sql_queries': sample['sql_queries_total'],
+            'sql_ms': round(sample['sql_seconds_total'] * 1000, 3),
+            'serializer_ms': round(
+                sample['serializer_seconds_total'] * 1000, 3),
+            'response_bytes': sample['response_bytes_total'],
+        }, ensure_ascii=False))
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Журнал медленных запросов для эндпоинтов из SLOW_QUERIES['ROUTES']:
+    запросы дольше порога группируются по отпечатку, план EXPLAIN
+    снимается уже после ответа, в фоновом потоке.
+    Если SLOW_QUERIES['ENABLED'] выключен, middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERIES['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(slow_queries.record))
+                return self.get_response(request)
+        finally:
+            route, samples = slow_queries.stop()
+            if samples:
+                slow_queries.flush(route, samples)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route, _ = resolve_route(request)
+        if route in settings.SLOW_QUERIES['ROUTES']:
+            slow_queries.start(route)
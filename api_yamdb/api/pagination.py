@@ -0,0 +1,53 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация без COUNT(*) и без OFFSET по всей таблице.
+    Порядок фиксирован и не зависит от параметра `ordering`.
+    """
+    page_size_query_param = 'limit'
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    По умолчанию limit/offset, как и раньше.
+    Курсорный режим включается параметром `?pagination=cursor`
+    (ссылки `next`/`previous` в этом режиме содержат `cursor`).
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    keyset_ordering = ('-pk',)
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(self.keyset_ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlesPagination(LimitOffsetOrKeysetPagination):
+    keyset_ordering = ('id',)
+
+
+class PubDatePagination(LimitOffsetOrKeysetPagination):
+    keyset_ordering = ('-pub_date', '-id')
@@ -25,6 +25,6 @@ class IsAuthorAdminModeratorOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
                 or (not request.user.is_anonymous
-                    and (request.user == obj.author
+                    and (request.user.id == obj.author_id
                          or request.user.is_admin
                          or request.user.is_moderator)))
@@ -1,5 +1,4 @@
 from django.contrib.auth.validators import ASCIIUsernameValidator
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import IntegerField
@@ -102,11 +101,11 @@ class ReviewSerializer(serializers.ModelSerializer):
     score = IntegerField(validators=[check_score])
 
     def validate(self, attrs):
-        title = get_object_or_404(
-            models.Title,
-            id=self.context.get('view').kwargs.get('title_id'))
+        title = self.context.get('view').get_title_or_404()
         request = self.context.get('request')
-        if (request.method != 'PATCH'
+        # В bulk уникальность проверяется одним запросом на всю пачку.
+        if (self.instance is None
+            and not self.context.get('bulk')
             and models.Review.objects.filter(
                 title_id=title.id, author=request.user).exists()):
             raise serializers.ValidationError(
@@ -0,0 +1,79 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from .authentication import REVOKED, current_version, remember_version
+from .cache import invalidate, invalidate_all
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    invalidate('genres')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate(
+        'titles', f'title:{instance.pk}', f'reviews:title:{instance.pk}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        invalidate_all()
+    else:
+        invalidate('titles', f'title:{instance.pk}')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate(
+        'titles',
+        f'title:{instance.title_id}',
+        f'reviews:title:{instance.title_id}',
+        f'comments:review:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate(f'comments:review:{instance.review_id}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_username(sender, instance, **kwargs):
+    """
+    Username автора есть в закэшированных отзывах и комментариях;
+    регистрация, вход и смена других полей их не меняют.
+    """
+    previous = getattr(instance, '_previous_username', None)
+    if previous is not None and previous != instance.username:
+        invalidate('users')
+
+
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, **kwargs):
+    invalidate('users')
+
+
+@receiver(post_save, sender=User)
+def refresh_token_version(sender, instance, **kwargs):
+    remember_version(instance.pk, current_version(instance))
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens(sender, instance, **kwargs):
+    remember_version(instance.pk, REVOKED)
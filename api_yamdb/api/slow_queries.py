@@ -0,0 +1,154 @@
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+from threading import local
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from reviews.models import SlowQuery
+
+EXPLAIN = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+# Значения в плане PostgreSQL: строки ('a@b.c'::text, '{1,2}'::integer[])
+# и числа справа от операторов сравнения в условиях. Оценки стоимости
+# (cost=0.00..8.27 rows=1) пишутся без пробела и остаются.
+PLAN_LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), "'?'"),
+    (re.compile(r'(?<=[=<>~] )-?\d+(?:\.\d+)?\b'), '?'),
+)
+
+_current = local()
+# EXPLAIN и запись в журнал выполняются вне запроса, по одному.
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def fingerprint(sql):
+    """Отпечаток запроса: текст без значений и длины списков IN."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return md5(sql.strip().encode()).hexdigest()
+
+
+def start(route):
+    _current.route = route
+    _current.samples = []
+
+
+def stop():
+    samples = getattr(_current, 'samples', None)
+    _current.samples = None
+    return getattr(_current, 'route', None), samples
+
+
+def record(execute, sql, params, many, context):
+    """
+    execute_wrapper: запоминает запросы дольше порога. Работает только
+    внутри эндпоинтов из SLOW_QUERIES['ROUTES'], с вероятностью
+    SAMPLE_RATE.
+    """
+    samples = getattr(_current, 'samples', None)
+    if samples is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        millis = (time.perf_counter() - started) * 1000
+        if (not many
+                and millis >= settings.SLOW_QUERIES['THRESHOLD_MS']
+                and random.random() < settings.SLOW_QUERIES['SAMPLE_RATE']):
+            samples.append(
+                (sql, params, millis, context['connection'].alias))
+
+
+def explain(sql, params, using):
+    """План запроса: EXPLAIN QUERY PLAN на SQLite, EXPLAIN на Postgres."""
+    connection = connections[using]
+    prefix = EXPLAIN.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return ''
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def redact_plan(plan):
+    """План без значений параметров: EXPLAIN на PostgreSQL их подставляет."""
+    for pattern, replacement in PLAN_LITERALS:
+        plan = pattern.sub(replacement, plan)
+    return plan
+
+
+def save(route, sql, params, millis, using):
+    """
+    Учитывает запрос в журнале. План снимается для нового отпечатка
+    и когда запрос оказался медленнее прежнего максимума; в журнале
+    остаются только SIZE худших отпечатков. В журнал попадает текст
+    с плейсхолдерами и план без значений: значения (email, коды) нужны
+    только для вызова EXPLAIN.
+    """
+    key = fingerprint(sql)
+    journal = SlowQuery.objects.filter(fingerprint=key)
+    worst = journal.values_list('max_ms', flat=True).first()
+    fields = {}
+    if worst is None or millis > worst:
+        fields = {'sql': sql,
+                  'plan': redact_plan(explain(sql, params, using)),
+                  'route': route}
+    if worst is None:
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=key, calls=1, total_ms=millis,
+                    max_ms=millis, **fields)
+        except IntegrityError:
+            pass
+        else:
+            trim(settings.SLOW_QUERIES['SIZE'])
+            return
+    journal.update(
+        calls=F('calls') + 1,
+        total_ms=F('total_ms') + millis,
+        max_ms=Greatest(F('max_ms'), Value(millis)),
+        **fields
+    )
+
+
+def trim(size):
+    keep = list(SlowQuery.objects.order_by('-max_ms').values_list(
+        'pk', flat=True)[:size])
+    SlowQuery.objects.exclude(pk__in=keep).delete()
+
+
+def _save_all(route, samples):
+    try:
+        for sample in samples:
+            save(route, *sample)
+    finally:
+        if settings.SLOW_QUERIES['BACKGROUND']:
+            connections.close_all()
+
+
+def flush(route, samples):
+    if settings.SLOW_QUERIES['BACKGROUND']:
+        _executor.submit(_save_all, route, samples)
+    else:
+        _save_all(route, samples)
@@ -0,0 +1,86 @@
+from abc import ABCMeta, abstractmethod
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle, metaclass=ABCMeta):
+    """
+    Скользящее окно на двух счётчиках в общем кэше: число запросов
+    оценивается как счётчик текущего окна плюс доля предыдущего,
+    пропорциональная ещё не истёкшей его части. Счётчик увеличивается
+    атомарным incr и до решения, поэтому отклонённые запросы тоже
+    учитываются: клиент, продолжающий перебор, остаётся заблокированным.
+    Решение принимается до обработчика и без запросов к базе.
+
+    Подкласс задаёт `scope` и обязан реализовать `get_ident_value`.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.AUTH_THROTTLE_CACHE]
+
+    @abstractmethod
+    def get_ident_value(self, request):
+        """
+        Чем ограничивается частота: IP, username и т.п. Пустое значение —
+        запрос не ограничивается.
+        """
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': md5(str(ident).encode()).hexdigest(),
+        }
+
+    def increment(self, key):
+        self.cache.add(key, 0, self.duration * 2)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Счётчик вытеснили между add и incr.
+            self.cache.add(key, 1, self.duration * 2)
+            return 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        previous = self.cache.get(f'{self.key}:{int(window) - 1}', 0)
+        current = self.increment(f'{self.key}:{int(window)}')
+        self.remaining = self.duration - elapsed
+        estimate = previous * (self.remaining / self.duration) + current
+        return estimate <= self.num_requests
+
+    def wait(self):
+        return self.remaining
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    """
+    Адрес клиента по правилам DRF: X-Forwarded-For учитывается
+    только при NUM_PROXIES > 0, иначе клиент мог бы его подделать.
+    """
+    scope = 'auth_ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(SlidingWindowThrottle):
+    scope = 'auth_username'
+
+    def get_ident_value(self, request):
+        if not isinstance(request.data, dict):
+            return None
+        username = request.data.get('username')
+        return username.strip().lower() if isinstance(username, str) else None
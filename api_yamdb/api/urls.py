@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from . import views
@@ -27,5 +27,9 @@ urlpatterns = [
     path('v1/auth/signup/', views.APISignUp.as_view()),
     path('v1/auth/token/', views.APIToken.as_view()),
     path('v1/users/me/', views.APIMeUser.as_view()),
+    path('v1/cache/stats/', views.APICacheStats.as_view()),
+    path('v1/metrics/', views.APIMetrics.as_view()),
+    re_path(r'^v1/export/(?P<name>titles|reviews|comments)\.ndjson$',
+            views.APIExport.as_view()),
     path('v1/', include(router_v1.urls))
 ]
@@ -1,74 +1,100 @@
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.mixins import (
     CreateModelMixin, DestroyModelMixin,
     ListModelMixin
 )
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
 
+from . import db_routers
+from . import export
 from . import permissions
 from . import serializers
+from . import throttling
+from .authentication import token_for_user
+from .cache import cache_response, get_stats, invalidate
+from .metrics import CONTENT_TYPE, registry, timed_serializer
 from .filters import TitleFilter
-from api_yamdb.settings import CODE_LENGTH
+from .pagination import PubDatePagination, TitlesPagination
+from reviews import confirmation, outbox
 from reviews.models import Category, Title, Genre, Review, User
+from reviews.ratings import apply_score_change
 
 
 EMAIL_SUBJECT = 'Код подтверждения для проекта YamDB'
 EMAIL_MESSAGE = '{}, Ваш код подтверждения: {}'
 
 
-def set_code(user):
-    user.confirmation_code = get_random_string(
-        CODE_LENGTH, '123456789')
-    user.save()
-    return user.confirmation_code
-
-
-def send_code(user):
+def send_code(user, code):
     """
-    Аргумент 'from_email' содержит адрес отправителя.
-    Если не определён или 'None' в качестве адреса
-    отправителя используется заданное по умолчанию
-    в DEFAULT_FROM_EMAIL 'webmaster@localhost'.
+    Письмо ставится в очередь и отправляется воркером
+    `manage.py send_emails`, а не во время запроса.
+    Адрес отправителя берётся из DEFAULT_FROM_EMAIL
+    (по умолчанию 'webmaster@localhost').
     """
-    send_mail(
+    outbox.enqueue(
         subject=EMAIL_SUBJECT,
         message=EMAIL_MESSAGE.format(
             user.username,
-            user.confirmation_code
+            code
         ),
-        from_email=None,
-        recipient_list=[user.email]
+        recipient=user.email
     )
 
 
+def bulk_create_with_ids(model, objects):
+    """
+    bulk_create, после которого у объектов есть pk на любой базе.
+    SQLite не возвращает id вставленных строк, но внутри транзакции
+    пишет только этот запрос, а AUTOINCREMENT выдаёт id подряд, поэтому
+    они восстанавливаются по last_insert_rowid(). Вызывать в atomic().
+    """
+    model.objects.bulk_create(objects)
+    connection = connections[router.db_for_write(model)]
+    if (not objects or connection.features.can_return_ids_from_bulk_insert
+            or connection.vendor != 'sqlite'):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT last_insert_rowid()')
+        last_id = cursor.fetchone()[0]
+    for pk, obj in enumerate(objects, start=last_id - len(objects) + 1):
+        obj.pk = pk
+
+
 class APIToken(APIView):
+    throttle_classes = (
+        throttling.AuthIPThrottle, throttling.AuthUsernameThrottle)
 
     def post(self, request):
         serializer = serializers.UsernameCodeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = get_object_or_404(
             User, username=serializer.data['username'])
-        if serializer.data['confirmation_code'] == str(
-            user.confirmation_code
-        ) and user.is_active:
-            token = {'token': str(AccessToken.for_user(user))}
+        if user.is_active and confirmation.consume(
+            user, serializer.data['confirmation_code']
+        ):
+            token = {'token': str(token_for_user(user))}
             return Response(token, status=status.HTTP_200_OK)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
 class APISignUp(APIView):
+    throttle_classes = (
+        throttling.AuthIPThrottle, throttling.AuthUsernameThrottle)
 
     def post(self, request):
         serializer = serializers.SignUpSerializer(data=request.data)
@@ -80,8 +106,7 @@ class APISignUp(APIView):
             )
         except IntegrityError:
             raise ValidationError('Указанные username или email уже заняты.')
-        set_code(user)
-        send_code(user)
+        send_code(user, confirmation.issue(user))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -89,52 +114,160 @@ class APIMeUser(APIView):
 
     permission_classes = (IsAuthenticated, )
 
+    def get_user(self):
+        """В токене только роль и имя, профиль читаем из базы."""
+        if getattr(self.request.user, 'from_token', False):
+            return get_object_or_404(User, pk=self.request.user.pk)
+        return self.request.user
+
     def get(self, request):
-        return Response(serializers.MeSerializer(request.user).data)
+        return Response(timed_serializer(
+            serializers.MeSerializer(self.get_user())).data)
 
     def patch(self, request):
+        user = self.get_user()
         serializer = serializers.MeSerializer(
-            request.user,
+            user,
             data=request.data,
             partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(
-            serializers.MeSerializer(request.user).data,
+            timed_serializer(serializers.MeSerializer(user)).data,
             status=status.HTTP_200_OK
         )
 
 
-class UserViewSet(ModelViewSet):
+class APICacheStats(APIView):
+    permission_classes = (permissions.IsAdmin,)
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class APIMetrics(APIView):
+    """Метрики запросов этого процесса в текстовом формате Prometheus."""
+    permission_classes = (permissions.IsAdmin,)
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+
+
+class APIExport(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов или комментариев в NDJSON:
+    по объекту JSON на строку, память не зависит от размера таблицы.
+    Для отзывов и комментариев `since` (дата или дата и время ISO 8601,
+    по умолчанию в UTC) оставляет записи с pub_date не раньше него.
+    """
+    permission_classes = (permissions.IsAdmin,)
+
+    def get_since(self, name):
+        since = self.request.query_params.get('since')
+        if since is None:
+            return {}
+        if name == 'titles':
+            raise ValidationError({'since': 'У произведений нет pub_date.'})
+        try:
+            value = parse_datetime(since)
+            if value is None and parse_date(since) is not None:
+                value = datetime.combine(parse_date(since), time())
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError(
+                {'since': 'Ожидается дата и время в формате ISO 8601.'})
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, timezone.utc)
+        return {'since': value}
+
+    def get(self, request, name):
+        lines = export.EXPORTS[name](**self.get_since(name))
+        return StreamingHttpResponse(
+            export.batches(lines), content_type=export.CONTENT_TYPE)
+
+
+class SerializerMetricsMixin:
+    """Время сериализации ответа учитывается в метриках запроса."""
+
+    def get_serializer(self, *args, **kwargs):
+        return timed_serializer(super().get_serializer(*args, **kwargs))
+
+
+class UserViewSet(SerializerMetricsMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = serializers.UserSerializer
     permission_classes = (permissions.IsAdmin,)
-    search_fields = 'username'
+    filter_backends = (SearchFilter,)
+    search_fields = ('username',)
     lookup_field = 'username'
 
 
-class CategoryGenreViewSet(GenericViewSet, CreateModelMixin,
+class ReplicaReadMixin:
+    """
+    Безопасные запросы действий из `replica_actions` читают с алиасов
+    DATABASE_READ_ALIASES. Аутентификация и проверка прав выполняются
+    до переключения и всегда идут в основную базу. Успешная запись
+    ставит клиенту cookie, и следующие DATABASE_STICKY['SECONDS']
+    секунд он читает из основной базы.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        db_routers.read_from_replica(
+            request.method in SAFE_METHODS
+            and self.action in self.replica_actions
+            and not db_routers.is_sticky(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        db_routers.read_from_replica(False)
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        if (request.method not in SAFE_METHODS
+                and status.is_success(response.status_code)
+                and db_routers.enabled()):
+            db_routers.stick(response)
+        return response
+
+
+class CategoryGenreViewSet(SerializerMetricsMixin, ReplicaReadMixin,
+                           GenericViewSet,
+                           CreateModelMixin,
                            DestroyModelMixin, ListModelMixin):
     permission_classes = (permissions.IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ('=name',)
     lookup_field = 'slug'
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 class CategoriesViewSet(CategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = serializers.CategoriesSerializer
+    cache_dependencies = ('categories',)
 
 
 class GenresViewSet(CategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = serializers.GenresSerializer
+    cache_dependencies = ('genres',)
 
 
-class TitlesViewSet(ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitlesViewSet(SerializerMetricsMixin, ReplicaReadMixin,
+                    ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     permission_classes = (permissions.IsAdminOrReadOnly,)
+    pagination_class = TitlesPagination
     filter_backends = (DjangoFilterBackend, OrderingFilter)
     ordering_fields = ('rating',)
     filterset_class = TitleFilter
@@ -144,17 +277,194 @@ class TitlesViewSet(ModelViewSet):
             return serializers.TitlesReadOnlySerializer
         return serializers.TitlesSerializer
 
+    def get_cache_dependencies(self):
+        if self.action == 'retrieve':
+            return (f'title:{self.kwargs["pk"]}', 'categories', 'genres')
+        return ('titles', 'categories', 'genres')
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class NestedViewSet(SerializerMetricsMixin, ReplicaReadMixin,
+                    ModelViewSet):
+    """
+    Вьюсет вложенного маршрута. Родительский объект ищется одним
+    запросом по всем параметрам URL из `parent_lookups`
+    (поле модели -> параметр URL) и один раз за запрос; вьюсет,
+    сериализатор и права доступа получают его через `get_parent_or_404`.
+    """
+    parent_model = None
+    parent_lookups = {}
+    # Поле дочерней модели, ссылающееся на родителя (для bulk).
+    parent_field = None
+
+    def get_parent_or_404(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model,
+                **{field: self.kwargs.get(url_kwarg)
+                   for field, url_kwarg in self.parent_lookups.items()})
+        return self._parent
+
+    def get_permissions(self):
+        if self.action == 'bulk':
+            return (permissions.IsAdmin(),)
+        return super().get_permissions()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['bulk'] = self.action == 'bulk'
+        return context
+
+    def bulk_author_errors(self, parent, author_ids):
+        """Ошибки авторов пачки по индексам; проверка — одним запросом."""
+        return {}
+
+    def bulk_saved(self, parent, objects):
+        """
+        bulk_create не отправляет сигналы: здесь обновляется всё,
+        что обычно делают обработчики post_save.
+        """
+
+    def bulk_authors(self, items, errors):
+        """
+        Авторы пачки по индексам элементов, одним запросом; для элементов
+        без автора или с неизвестным username ошибка пишется в `errors`.
+        """
+        usernames = {
+            item.get('author') for item in items if isinstance(item, dict)
+        }
+        users = {
+            user.username: user for user in User.objects.filter(
+                username__in=[name for name in usernames if name]
+            ).only('id', 'username')
+        }
+        authors = {}
+        for index, item in enumerate(items):
+            username = item.get('author') if isinstance(item, dict) else None
+            if not username:
+                errors[index]['author'] = ['Обязательное поле.']
+            elif username not in users:
+                errors[index]['author'] = [
+                    f'Пользователь {username} не найден.']
+            else:
+                authors[index] = users[username]
+        return authors
+
+    def add_author_errors(self, errors, parent, author_ids):
+        for index, message in self.bulk_author_errors(
+                parent, author_ids).items():
+            errors[index]['author'] = [message]
+
+    def bulk_conflict(self, parent, items, author_ids):
+        """
+        Проверка авторов идёт без блокировки: параллельный запрос мог
+        успеть создать конфликтующий объект. Повторяем её и отвечаем 400.
+        """
+        errors = [{} for _ in items]
+        self.add_author_errors(errors, parent, author_ids)
+        if not any(errors):
+            raise ValidationError(
+                'Конфликт с параллельной записью, повторите запрос.')
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=('post',))
+    def bulk(self, request, *args, **kwargs):
+        """
+        Создаёт до BULK_CREATE_MAX_ITEMS объектов одним INSERT в одной
+        транзакции. Каждый элемент — поля сериализатора и `author`
+        (username). Если хоть один элемент не прошёл проверку, ничего
+        не создаётся, а ответ 400 содержит список ошибок по элементам
+        (пустой словарь для корректных).
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Ожидается список объектов.')
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            raise ValidationError(
+                f'Не больше {settings.BULK_CREATE_MAX_ITEMS} объектов '
+                f'за запрос.')
+        parent = self.get_parent_or_404()
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid()
+        errors = (
+            [dict(error) for error in serializer.errors]
+            if serializer.errors else [{} for _ in items]
+        )
+        authors = self.bulk_authors(items, errors)
+        author_ids = {index: author.pk for index, author in authors.items()}
+        self.add_author_errors(errors, parent, author_ids)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        model = self.get_serializer_class().Meta.model
+        objects = [
+            model(author=authors[index],
+                  **{self.parent_field: parent}, **data)
+            for index, data in enumerate(serializer.validated_data)
+        ]
+        try:
+            with transaction.atomic():
+                bulk_create_with_ids(model, objects)
+                self.bulk_saved(parent, objects)
+        except IntegrityError:
+            return self.bulk_conflict(parent, items, author_ids)
+        return Response(
+            self.get_serializer(objects, many=True).data,
+            status=status.HTTP_201_CREATED)
+
 
-class ReviewsViewSet(ModelViewSet):
+class ReviewsViewSet(NestedViewSet):
     serializer_class = serializers.ReviewSerializer
     permission_classes = (permissions.IsAuthorAdminModeratorOrReadOnly,)
+    pagination_class = PubDatePagination
+    parent_model = Title
+    parent_lookups = {'id': 'title_id'}
+    parent_field = 'title'
 
     def get_title_or_404(self):
-        return get_object_or_404(
-            Title, id=self.kwargs.get('title_id'))
+        return self.get_parent_or_404()
+
+    def bulk_author_errors(self, parent, author_ids):
+        """Ограничение unique_review: один отзыв автора на произведение."""
+        existing = set(Review.objects.filter(
+            title=parent, author_id__in=set(author_ids.values())
+        ).values_list('author_id', flat=True))
+        errors = {}
+        seen = set()
+        for index, author_id in author_ids.items():
+            if author_id in existing:
+                errors[index] = 'Автор уже писал отзыв на это произведение.'
+            elif author_id in seen:
+                errors[index] = 'Повторный отзыв автора в пачке.'
+            seen.add(author_id)
+        return errors
+
+    def bulk_saved(self, parent, objects):
+        apply_score_change(
+            Title, parent.pk,
+            sum(review.score for review in objects), len(objects))
+        transaction.on_commit(lambda: invalidate(
+            'titles', f'title:{parent.pk}', f'reviews:title:{parent.pk}'))
 
     def get_queryset(self):
-        return self.get_title_or_404().reviews.all()
+        return self.get_title_or_404().reviews.select_related('author')
+
+    def get_cache_dependencies(self):
+        return (f'reviews:title:{self.kwargs.get("title_id")}', 'users')
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(
@@ -163,16 +473,35 @@ class ReviewsViewSet(ModelViewSet):
         )
 
 
-class CommentsViewSet(ModelViewSet):
+class CommentsViewSet(NestedViewSet):
     serializer_class = serializers.CommentSerializer
     permission_classes = (permissions.IsAuthorAdminModeratorOrReadOnly,)
+    pagination_class = PubDatePagination
+    parent_model = Review
+    parent_lookups = {'id': 'review_id', 'title_id': 'title_id'}
+    parent_field = 'review'
+
+    def bulk_saved(self, parent, objects):
+        transaction.on_commit(
+            lambda: invalidate(f'comments:review:{parent.pk}'))
 
     def get_rewiew_or_404(self):
-        return get_object_or_404(
-            Review, id=self.kwargs.get('review_id'))
+        return self.get_parent_or_404()
 
     def get_queryset(self):
-        return self.get_rewiew_or_404().comments.all()
+        return self.get_rewiew_or_404().comments.select_related(
+            'author')
+
+    def get_cache_dependencies(self):
+        return (f'comments:review:{self.kwargs.get("review_id")}', 'users')
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(
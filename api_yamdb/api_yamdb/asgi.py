@@ -3,14 +3,21 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 has no ASGI support of its own: the WSGI application is
+served through ``api_yamdb.asgi_handler.ASGIHandler``, e.g.
+
+    uvicorn api_yamdb.asgi:application
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from .asgi_handler import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+application = ASGIHandler(
+    get_wsgi_application(), settings.ASGI_THREADS,
+    settings.ASGI_MAX_BODY_SIZE)
@@ -0,0 +1,169 @@
+"""
+ASGI-приложение поверх WSGI-обработчика Django.
+
+В Django 2.2 нет асинхронных представлений, поэтому сами представления
+выполняются как прежде, в пуле из ASGI_THREADS потоков. Асинхронной
+остаётся работа с клиентом: тело запроса читается и ответ отправляется
+в цикле событий, и медленный клиент не занимает поток. Поток занят
+только на время обработки запроса Django.
+
+Тело запроса держится в памяти целиком, поэтому его размер ограничен
+`max_body_size`: на более длинный запрос отвечаем 413, не дочитывая его.
+"""
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+
+TOO_LARGE_BODY = json.dumps(
+    {'detail': 'Слишком большое тело запроса.'}, ensure_ascii=False
+).encode()
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+class ASGIHandler:
+
+    def __init__(self, wsgi_application, threads, max_body_size=None):
+        self.wsgi_application = wsgi_application
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения: {scope["type"]}')
+        try:
+            body = await self.read_body(scope, receive)
+        except RequestTooLarge:
+            await send({'type': 'http.response.start', 'status': 413,
+                        'headers': [(b'content-type', b'application/json'),
+                                    (b'connection', b'close')]})
+            await send({'type': 'http.response.body',
+                        'body': TOO_LARGE_BODY})
+            return
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        status, headers, chunks = await loop.run_in_executor(
+            self.executor, self.run, environ(scope, body), loop, send)
+        if chunks is None:
+            # Потоковый ответ уже отправлен из потока обработчика.
+            return
+        await send({'type': 'http.response.start',
+                    'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, scope, receive):
+        """
+        Тело запроса или None, если клиент отключился. Если тело длиннее
+        max_body_size (по Content-Length или фактически), поднимает
+        RequestTooLarge.
+        """
+        limit = self.max_body_size
+        if limit is not None:
+            for name, value in scope.get('headers', ()):
+                if (name.lower() == b'content-length' and value.isdigit()
+                        and int(value) > limit):
+                    raise RequestTooLarge
+        body = BytesIO()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            body.write(message.get('body', b''))
+            if limit is not None and body.tell() > limit:
+                raise RequestTooLarge
+            if not message.get('more_body', False):
+                return body.getvalue()
+
+    def run(self, environ, loop, send):
+        """
+        Выполняется в потоке пула. Обычный ответ собирается целиком
+        и отправляется уже из цикла событий. Потоковый ответ (например,
+        выгрузка) читает базу по мере отправки, а соединения Django
+        привязаны к потоку, поэтому его части отправляются отсюда.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            if not getattr(result, 'streaming', False):
+                return started['status'], started['headers'], list(result)
+
+            def send_from_thread(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            send_from_thread({'type': 'http.response.start',
+                              'status': started['status'],
+                              'headers': started['headers']})
+            for chunk in result:
+                if chunk:
+                    send_from_thread({'type': 'http.response.body',
+                                      'body': chunk, 'more_body': True})
+            send_from_thread({'type': 'http.response.body', 'body': b''})
+            return started['status'], started['headers'], None
+        finally:
+            # Django закрывает соединения с базой по сигналу request_finished.
+            result.close()
+
+
+def environ(scope, body):
+    """WSGI environ для ASGI-запроса (строки — байты в latin-1, PEP 3333)."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    result = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin-1')
+        if name in result:
+            # Повторные Cookie склеиваются через "; " (RFC 7540, 8.1.2.5),
+            # остальные заголовки — через запятую.
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = f'{result[name]}{separator}{value}'
+        result[name] = value
+    # Тело уже прочитано целиком, в том числе без Content-Length.
+    result['CONTENT_LENGTH'] = str(len(body))
+    return result
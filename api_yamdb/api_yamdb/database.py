@@ -0,0 +1,143 @@
+"""
+Настройки баз данных из переменных окружения.
+
+DB_ENGINE            sqlite (по умолчанию) или postgresql
+DB_NAME              файл SQLite или имя базы PostgreSQL
+SQLITE_TUNING        1 (по умолчанию) — PRAGMA из SQLITE_PRAGMAS при каждом
+                     новом соединении с SQLite; значения переопределяются
+                     переменными SQLITE_<ИМЯ>, например SQLITE_MMAP_SIZE
+POSTGRES_USER, POSTGRES_PASSWORD, DB_HOST, DB_PORT
+CONN_MAX_AGE         время жизни постоянного соединения, с (0 — на запрос)
+DB_HEALTH_CHECKS     1 — проверять постоянное соединение перед запросом
+DB_POOL_SIZE         > 0 — пул соединений процесса вместо одного соединения
+                     на поток (только PostgreSQL, нужен psycopg2)
+DB_POOL_MIN_SIZE     соединений, открываемых пулом заранее (по умолчанию 1)
+DB_POOL_TIMEOUT      сколько секунд ждать свободного соединения пула
+                     (по умолчанию 10), затем OperationalError
+DB_REPLICA_HOSTS     хосты реплик через запятую: алиасы replica_1, replica_2…
+DB_READ_ALIASES      алиасы для чтения через запятую (по умолчанию — реплики)
+DB_STICKY_SECONDS    сколько секунд после записи клиент читает из default
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+POSTGRES_ENGINE = 'django.db.backends.postgresql'
+POOL_ENGINE = 'api_yamdb.db_backends.postgresql_pool'
+# WAL: читатели не блокируют писателя и наоборот; при synchronous=NORMAL
+# fsync выполняется только при контрольной точке журнала. Писатель,
+# встретивший блокировку, ждёт до busy_timeout мс, а не падает сразу.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # в КиБ, то есть 64 МиБ на соединение
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def postgres(host, environ):
+    pool_size = int(environ.get('DB_POOL_SIZE', 0))
+    return {
+        'ENGINE': POOL_ENGINE if pool_size else POSTGRES_ENGINE,
+        'NAME': environ.get('DB_NAME', 'postgres'),
+        'USER': environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': host,
+        'PORT': environ.get('DB_PORT', '5432'),
+        # С пулом соединение возвращается в пул в конце каждого запроса.
+        'CONN_MAX_AGE': 0 if pool_size else int(
+            environ.get('CONN_MAX_AGE', 60)),
+        'HEALTH_CHECKS': environ.get('DB_HEALTH_CHECKS', '1') == '1',
+        'POOL': {
+            'MIN_SIZE': int(environ.get('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': pool_size,
+            'TIMEOUT': float(environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+
+def sqlite_pragmas(environ):
+    if environ.get('SQLITE_TUNING', '1') != '1':
+        return {}
+    return {
+        name: environ.get(f'SQLITE_{name.upper()}', value)
+        for name, value in SQLITE_PRAGMAS.items()
+    }
+
+
+def databases(base_dir, environ=os.environ):
+    """
+    Словарь DATABASES. Реплики получают TEST MIRROR на default:
+    в тестах они читают ту же тестовую базу.
+    """
+    if environ.get('DB_ENGINE', 'sqlite') != 'postgresql':
+        return {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': environ.get(
+                    'DB_NAME', os.path.join(base_dir, 'db.sqlite3')),
+                'CONN_MAX_AGE': int(environ.get('CONN_MAX_AGE', 0)),
+                'PRAGMAS': sqlite_pragmas(environ),
+            }
+        }
+    config = {'default': postgres(environ.get('DB_HOST', 'localhost'),
+                                  environ)}
+    hosts = [
+        host.strip()
+        for host in environ.get('DB_REPLICA_HOSTS', '').split(',')
+        if host.strip()
+    ]
+    for number, host in enumerate(hosts, start=1):
+        config[f'replica_{number}'] = dict(
+            postgres(host, environ), TEST={'MIRROR': 'default'})
+    return config
+
+
+def replicas(config):
+    return tuple(alias for alias in config if alias.startswith('replica_'))
+
+
+def read_aliases(config, environ=os.environ):
+    aliases = tuple(
+        alias.strip()
+        for alias in environ.get('DB_READ_ALIASES', '').split(',')
+        if alias.strip()
+    )
+    unknown = set(aliases) - set(config)
+    if unknown:
+        raise ImproperlyConfigured(
+            f'DB_READ_ALIASES: нет баз {", ".join(sorted(unknown))}')
+    return aliases or replicas(config)
+
+
+def close_unusable_connections(**kwargs):
+    """
+    Обработчик request_started: постоянное соединение, которое сервер
+    успел закрыть, проверяется до первого запроса и переоткрывается,
+    а не приводит к ошибке 500.
+    """
+    from django.db import connections
+
+    for connection in connections.all():
+        if (connection.connection is not None
+                and connection.settings_dict.get('HEALTH_CHECKS')
+                and not connection.is_usable()):
+            connection.close()
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Обработчик connection_created: выполняет PRAGMA из настроек базы.
+    Запросы идут мимо курсора Django и не попадают в метрики и журналы.
+    """
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
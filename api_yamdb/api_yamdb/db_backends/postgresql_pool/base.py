@@ -0,0 +1,99 @@
+"""
+PostgreSQL с пулом соединений процесса (psycopg2 ThreadedConnectionPool).
+
+Соединение берётся из пула при первом запросе к базе и возвращается
+в него при закрытии (в конце HTTP-запроса при CONN_MAX_AGE = 0), поэтому
+потоки одного процесса делят не больше POOL['MAX_SIZE'] соединений.
+Если все соединения заняты, поток ждёт свободное до POOL['TIMEOUT']
+секунд: сам ThreadedConnectionPool в этом случае сразу поднимает
+PoolError. С HEALTH_CHECKS соединение из пула проверяется при выдаче,
+и разорванное сервером заменяется новым.
+"""
+from threading import BoundedSemaphore, Lock
+
+from django.db.backends.postgresql import base
+from psycopg2.pool import ThreadedConnectionPool
+
+_pools = {}
+_slots = {}
+_pools_lock = Lock()
+
+
+def is_usable(connection):
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                pool = self.settings_dict['POOL']
+                _pools[self.alias] = ThreadedConnectionPool(
+                    pool['MIN_SIZE'], pool['MAX_SIZE'], **conn_params)
+                _slots[self.alias] = BoundedSemaphore(pool['MAX_SIZE'])
+            return _pools[self.alias]
+
+    def checkout(self, pool):
+        """
+        Соединение из пула. Соединения, которые оказались разорваны,
+        закрываются; попыток не больше, чем соединений в пуле, плюс
+        одна на новое.
+        """
+        check = self.settings_dict.get('HEALTH_CHECKS')
+        for _ in range(self.settings_dict['POOL']['MAX_SIZE']):
+            connection = pool.getconn()
+            if not check or is_usable(connection):
+                return connection
+            pool.putconn(connection, close=True)
+        return pool.getconn()
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        slots = _slots[self.alias]
+        timeout = self.settings_dict['POOL']['TIMEOUT']
+        if not slots.acquire(timeout=timeout):
+            raise base.Database.OperationalError(
+                f'Пул {self.alias!r}: нет свободного соединения '
+                f'за {timeout} с.')
+        try:
+            connection = self.checkout(pool)
+        except BaseException:
+            slots.release()
+            raise
+        try:
+            self.set_isolation_level(connection)
+        except BaseException:
+            pool.putconn(connection, close=True)
+            slots.release()
+            raise
+        return connection
+
+    def set_isolation_level(self, connection):
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        try:
+            with self.wrap_database_errors:
+                # Пул сам откатит незавершённую транзакцию и закроет
+                # разорванное соединение вместо возврата.
+                _pools[self.alias].putconn(
+                    self.connection, close=bool(self.connection.closed))
+        finally:
+            _slots[self.alias].release()
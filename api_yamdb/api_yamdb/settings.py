@@ -1,6 +1,8 @@
 from datetime import timedelta
 import os
 
+from . import database
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = os.getenv('SECRET_KEY', default='SUP3R-S3CR3T-K3Y-F0R-MY-PR0J3CT')
@@ -31,6 +33,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.SlowQueryMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -54,14 +58,109 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Потоков для представлений под ASGI (см. api_yamdb/asgi_handler.py).
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=32))
+# Наибольшее тело запроса под ASGI, байт: длиннее — ответ 413.
+ASGI_MAX_BODY_SIZE = int(
+    os.getenv('ASGI_MAX_BODY_SIZE', default=10 * 1024 * 1024))
+
 
 # Database
 
-DATABASES = {
+# База данных задаётся переменными окружения, см. api_yamdb/database.py:
+# по умолчанию SQLite, для продакшена — PostgreSQL с постоянными
+# соединениями и, при необходимости, репликами для чтения.
+DATABASES = database.databases(BASE_DIR)
+
+DATABASE_REPLICAS = database.replicas(DATABASES)
+
+DATABASE_READ_ALIASES = database.read_aliases(DATABASES)
+
+DATABASE_STICKY = {
+    'COOKIE': 'yamdb_primary',
+    'SECONDS': int(os.getenv('DB_STICKY_SECONDS', default=5)),
+}
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+
+# Cache
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalogue': {
+        'BACKEND': os.getenv('CATALOGUE_CACHE_BACKEND', default=LOCMEM_CACHE),
+        'LOCATION': os.getenv('CATALOGUE_CACHE_LOCATION', default='catalogue'),
+    },
+    'throttle': {
+        'BACKEND': os.getenv(
+            'AUTH_THROTTLE_CACHE_BACKEND', default=LOCMEM_CACHE),
+        'LOCATION': os.getenv(
+            'AUTH_THROTTLE_CACHE_LOCATION', default='throttle'),
+    },
+}
+
+# Счётчики ограничения частоты запросов к /auth/ должны быть общими
+# для всех процессов: в продакшене это Redis или memcached. С LocMem
+# у каждого воркера свои счётчики, и лимит умножается на их число.
+AUTH_THROTTLE_CACHE = 'throttle'
+
+# Метрики запросов (/api/v1/metrics/ и лог api.metrics). Выключены
+# по умолчанию: тогда MetricsMiddleware не подключается вовсе.
+METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', default='0') == '1',
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+}
+
+# Журнал медленных SQL-запросов (админка, «Медленные запросы»).
+SLOW_QUERIES = {
+    'ENABLED': os.getenv('SLOW_QUERIES_ENABLED', default='0') == '1',
+    'THRESHOLD_MS': float(os.getenv('SLOW_QUERIES_THRESHOLD_MS', default=100)),
+    'SAMPLE_RATE': float(os.getenv('SLOW_QUERIES_SAMPLE_RATE', default=1)),
+    'SIZE': 50,
+    'ROUTES': (
+        'titles-list', 'titles-detail',
+        'reviews-list', 'reviews-detail',
+        'users-list',
+    ),
+    'BACKGROUND': True,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# У LocMem свой кэш в каждом процессе: запись, обработанная одним
+# воркером, не сбрасывает ответы других, и они отдают устаревшие данные.
+# Поэтому по умолчанию кэш включён только с общим бэкендом (Redis и т.п.).
+CATALOGUE_CACHE = {
+    'ALIAS': 'catalogue',
+    'ENABLED': os.getenv(
+        'CATALOGUE_CACHE_ENABLED',
+        default='0' if CACHES['catalogue']['BACKEND'] == LOCMEM_CACHE else '1'
+    ) == '1',
+    'TIMEOUT': int(os.getenv('CATALOGUE_CACHE_TIMEOUT', default=300)),
 }
 
 
@@ -108,6 +207,15 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_BASE': 30,
+    'BACKOFF_MAX': 3600,
+    'LEASE': 300,
+    'POLL_INTERVAL': 1.0,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -118,15 +226,47 @@ REST_FRAMEWORK = {
 
     'PAGE_SIZE': 100,
 
+    # Число доверенных прокси перед приложением. При 0 адрес клиента —
+    # REMOTE_ADDR, а X-Forwarded-For, который клиент может подделать,
+    # не учитывается. За nginx — 1.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
+
+    # /auth/signup/ и /auth/token/: с одного IP и для одного username.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('AUTH_THROTTLE_IP_RATE', default='30/min'),
+        'auth_username': os.getenv(
+            'AUTH_THROTTLE_USERNAME_RATE', default='5/min'),
+    },
+
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ]
 }
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=1)
+    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    'AUTH_TOKEN_CLASSES': ('api.authentication.PreparedKeyAccessToken',),
 }
 
+# Роль, is_staff и имя пользователя в access-токене: права проверяются
+# без запроса к таблице пользователей. Отзыв — через версию токенов,
+# которая кэшируется на VERSION_CACHE_TIMEOUT секунд.
+TOKEN_CLAIMS = {
+    'ENABLED': os.getenv('TOKEN_CLAIMS_ENABLED', '1') == '1',
+    'CACHE_ALIAS': 'default',
+    'VERSION_CACHE_TIMEOUT': 60,
+}
+
+# LRU проверенных токенов в памяти процесса: повторный запрос с тем же
+# токеном не проверяет подпись и не читает пользователя.
+AUTH_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'],
+}
+
+BULK_CREATE_MAX_ITEMS = 500
+
 CODE_LENGTH = 6
+CONFIRMATION_CODE_LIFETIME = timedelta(hours=1)
 EMAIL_LENGTH = 254
 USERNAME_LENGTH = 150
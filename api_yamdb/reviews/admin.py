@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (
+    Category, Comment, Genre, OutgoingEmail, Review, SlowQuery, Title, User
+)
 
 
 class TitleAdmin(admin.ModelAdmin):
@@ -8,7 +10,8 @@ class TitleAdmin(admin.ModelAdmin):
         'pk',
         'name',
         'year',
-        'category'
+        'category',
+        'rating'
     )
     list_editable = ('category',)
     search_fields = ('name',)
@@ -28,9 +31,50 @@ class ReviewAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'created',
+        'sent_at',
+        'attempts',
+        'failed'
+    )
+    list_filter = ('failed',)
+    search_fields = ('recipient',)
+    # В тексте неотправленного письма — действующий код подтверждения.
+    exclude = ('message',)
+    empty_value_display = '-пусто-'
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'route',
+        'max_ms',
+        'avg_ms',
+        'calls',
+        'last_seen'
+    )
+    list_filter = ('route',)
+    search_fields = ('sql',)
+    readonly_fields = (
+        'fingerprint', 'route', 'sql', 'plan', 'calls', 'total_ms',
+        'max_ms', 'last_seen'
+    )
+
+    def avg_ms(self, obj):
+        return round(obj.total_ms / obj.calls, 1) if obj.calls else None
+    avg_ms.short_description = 'В среднем, мс'
+
+    def has_add_permission(self, request):
+        return False
+
+
 admin.site.register(Category)
 admin.site.register(Comment)
 admin.site.register(Genre)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
 admin.site.register(Review, ReviewAdmin)
+admin.site.register(SlowQuery, SlowQueryAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(User)
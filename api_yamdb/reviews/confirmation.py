@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import (
+    constant_time_compare, get_random_string, salted_hmac
+)
+
+from .models import ConfirmationCode
+
+CODE_ALPHABET = '123456789'
+HMAC_SALT = 'reviews.confirmation.code'
+
+
+def code_hash(user_id, code):
+    """
+    HMAC кода на SECRET_KEY: по одной таблице кодов (без ключа)
+    короткий код не перебрать.
+    """
+    return salted_hmac(HMAC_SALT, f'{user_id}:{code}').hexdigest()
+
+
+def issue(user):
+    """
+    Выдаёт пользователю новый код, заменяя прежний. Пишется только
+    строка кода: UPDATE, а для первого кода — INSERT.
+    Возвращает код в открытом виде для письма.
+    """
+    code = get_random_string(settings.CODE_LENGTH, CODE_ALPHABET)
+    values = {
+        'code_hash': code_hash(user.pk, code),
+        'expires_at': timezone.now() + settings.CONFIRMATION_CODE_LIFETIME,
+    }
+    codes = ConfirmationCode.objects.filter(user_id=user.pk)
+    if not codes.update(**values):
+        try:
+            with transaction.atomic():
+                ConfirmationCode.objects.create(user_id=user.pk, **values)
+        except IntegrityError:
+            # Параллельный запрос успел создать код первым.
+            codes.update(**values)
+    return code
+
+
+def consume(user, code):
+    """
+    Проверяет код и гасит его. Удаление с условием на хэш гарантирует,
+    что из параллельных запросов с одним кодом успешен только один.
+    """
+    stored = ConfirmationCode.objects.filter(
+        user_id=user.pk, expires_at__gt=timezone.now()
+    ).values_list('code_hash', flat=True).first()
+    if stored is None or not constant_time_compare(
+            stored, code_hash(user.pk, code)):
+        return False
+    deleted, _ = ConfirmationCode.objects.filter(
+        user_id=user.pk, code_hash=stored).delete()
+    return deleted > 0
+
+
+def purge_expired():
+    """Удаляет просроченные коды одним DELETE по индексу expires_at."""
+    deleted, _ = ConfirmationCode.objects.filter(
+        expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,208 @@
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import (
+    Category, Comment, Genre, ImportCheckpoint, Review, Title, User
+)
+
+# Файлы перечислены в порядке зависимостей по внешним ключам.
+# Для каждого файла: модель и соответствие "колонка CSV -> поле модели".
+IMPORT_SPEC = (
+    ('users.csv', User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'role': 'role', 'bio': 'bio', 'first_name': 'first_name',
+        'last_name': 'last_name'}),
+    ('category.csv', Category, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('genre.csv', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('titles.csv', Title, {
+        'id': 'id', 'name': 'name', 'year': 'year', 'category': 'category'}),
+    ('genre_title.csv', Title.genre.through, {
+        'id': 'id', 'title_id': 'title', 'genre_id': 'genre'}),
+    ('review.csv', Review, {
+        'id': 'id', 'title_id': 'title', 'text': 'text', 'author': 'author',
+        'score': 'score', 'pub_date': 'pub_date'}),
+    ('comments.csv', Comment, {
+        'id': 'id', 'review_id': 'review', 'text': 'text',
+        'author': 'author', 'pub_date': 'pub_date'}),
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def default_values(model):
+    """Значения полей, которых нет в CSV."""
+    if model is User:
+        return {
+            'password': make_password(None),
+            'date_joined': timezone.now(),
+        }
+    return {}
+
+
+def insert_sql(model, connection):
+    fields = model._meta.concrete_fields
+    quote = connection.ops.quote_name
+    return 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+
+def row_values(model, columns, row, connection):
+    """
+    Строка CSV -> параметры INSERT. Объект модели нужен ради значений
+    по умолчанию, а pre_save(add=False) сохраняет `pub_date` из файла
+    вместо подстановки auto_now_add.
+    """
+    data = default_values(model)
+    for column, name in columns.items():
+        data[model._meta.get_field(name).attname] = row[column]
+    instance = model(**data)
+    return [
+        field.get_db_prep_save(field.pre_save(instance, False), connection)
+        for field in model._meta.concrete_fields
+    ]
+
+
+def read_records(path, offset=0):
+    """
+    Потоково читает CSV и для каждой записи отдаёт байтовое смещение
+    её конца: с него можно продолжить чтение после сбоя. Файл читается
+    в бинарном режиме, поэтому смещение точное и для многострочных полей.
+    """
+    with open(path, 'rb') as csvfile:
+        header = next(csv.reader([csvfile.readline().decode('utf-8')]))
+        position = max(offset, csvfile.tell())
+        csvfile.seek(position)
+
+        def lines():
+            nonlocal position
+            for line in csvfile:
+                position += len(line)
+                yield line.decode('utf-8')
+
+        for record in csv.reader(lines()):
+            yield dict(zip(header, record)), position
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_file(path, model, columns, batch_size=DEFAULT_BATCH_SIZE,
+                using='default'):
+    """
+    Потоково загружает один файл: каждая пачка из `batch_size` строк
+    вставляется одним executemany в отдельной транзакции вместе
+    с контрольной точкой, поэтому прерванную загрузку можно продолжить
+    ровно с первой незафиксированной строки.
+    Возвращает (число строк, загруженных в этот запуск, секунды).
+    """
+    connection = connections[using]
+    checkpoints = ImportCheckpoint.objects.using(using)
+    checkpoint, _ = checkpoints.get_or_create(
+        filename=os.path.basename(path))
+    if checkpoint.finished:
+        return 0, 0.0
+    sql = insert_sql(model, connection)
+    started = time.monotonic()
+    total = 0
+    for batch in batches(read_records(path, checkpoint.offset), batch_size):
+        params = [
+            row_values(model, columns, row, connection) for row, _ in batch
+        ]
+        checkpoint.offset = batch[-1][1]
+        checkpoint.rows += len(params)
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+            checkpoint.save(update_fields=('offset', 'rows'))
+        total += len(params)
+    checkpoint.finished = True
+    checkpoint.save(update_fields=('finished',))
+    return total, time.monotonic() - started
+
+
+def dependencies(model):
+    return {
+        field.related_model for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model is not model
+    }
+
+
+def import_waves(spec=IMPORT_SPEC):
+    """
+    Делит файлы на волны по внешним ключам: файлы одной волны
+    не ссылаются друг на друга и могут загружаться параллельно.
+    """
+    pending = list(spec)
+    while pending:
+        waiting = {model for _, model, _ in pending}
+        wave = [
+            item for item in pending
+            if not dependencies(item[1]) & waiting
+        ]
+        if not wave:
+            raise ValueError('Циклическая зависимость между файлами импорта.')
+        yield wave
+        pending = [item for item in pending if item not in wave]
+
+
+def _import_in_thread(path, model, columns, batch_size, using):
+    try:
+        return import_file(path, model, columns, batch_size, using)
+    finally:
+        connections[using].close()
+
+
+def import_all(data_dir, batch_size=DEFAULT_BATCH_SIZE, using='default',
+               workers=1):
+    """
+    Загружает все файлы по волнам, распределяя файлы волны между
+    `workers` потоками. Отдаёт (модель, строки, секунды) по мере загрузки.
+    SQLite допускает только одного писателя, поэтому там загрузка
+    всегда последовательная.
+    """
+    if connections[using].vendor == 'sqlite':
+        workers = 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for wave in import_waves():
+            futures = [
+                (model, executor.submit(
+                    _import_in_thread, os.path.join(data_dir, filename),
+                    model, columns, batch_size, using))
+                for filename, model, columns in wave
+            ]
+            for model, future in futures:
+                yield (model, *future.result())
+
+
+def clear_checkpoints(using='default'):
+    ImportCheckpoint.objects.using(using).all().delete()
+
+
+def reset_sequences(using='default'):
+    """После вставки явных id сдвигает последовательности (Postgres)."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [model for _, model, _ in IMPORT_SPEC])
+    if not statements:
+        return
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
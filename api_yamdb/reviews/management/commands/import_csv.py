@@ -0,0 +1,71 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import invalidate_all
+from reviews.csv_import import (
+    DEFAULT_BATCH_SIZE, IMPORT_SPEC, clear_checkpoints, import_all,
+    reset_sequences
+)
+from reviews.models import Review, Title
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV-файлов в базу пачками '
+        'в порядке зависимостей по внешним ключам. Выполняется на чистую базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Сколько независимых файлов загружать параллельно.'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванную загрузку с контрольных точек.'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Алиас базы данных.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError(
+                '--batch-size и --workers должны быть положительными.')
+        for filename, _, _ in IMPORT_SPEC:
+            path = os.path.join(options['data_dir'], filename)
+            if not os.path.exists(path):
+                raise CommandError(f'Не найден файл {path}')
+        using = options['database']
+        if not options['resume']:
+            clear_checkpoints(using)
+        for model, rows, seconds in import_all(
+                options['data_dir'], options['batch_size'], using,
+                options['workers']):
+            self.stdout.write(
+                f'{model._meta.db_table}: {rows} строк за {seconds:.2f} с '
+                f'({rows / seconds if seconds else rows:.0f} строк/с)'
+            )
+        reset_sequences(using)
+        rebuild_ratings(Title, Review, Title.objects.using(using))
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS('Импорт завершён.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.confirmation import purge_expired
+from reviews.outbox import redact_finished
+
+
+class Command(BaseCommand):
+    help = ('Удаляет просроченные коды подтверждения и стирает текст '
+            'уже отправленных писем с кодами.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено просроченных кодов: {purge_expired()}, '
+            f'стёрто писем: {redact_finished()}.'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import invalidate_all
+from reviews.models import Review, Title
+from reviews.ratings import inconsistent_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённый рейтинг произведений по отзывам. '
+        'С флагом --check только проверяет согласованность.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        broken = inconsistent_ratings(Title)
+        if options['check']:
+            for title in broken:
+                self.stdout.write(
+                    f'title {title.pk}: сохранено '
+                    f'{title.rating_sum}/{title.rating_count} '
+                    f'({title.rating}), по отзывам '
+                    f'{title.actual_sum}/{title.actual_count} '
+                    f'({title.actual_rating})'
+                )
+            if broken.exists():
+                raise CommandError('Рейтинг произведений рассогласован.')
+            self.stdout.write(self.style.SUCCESS('Рейтинг согласован.'))
+            return
+        with transaction.atomic():
+            updated = rebuild_ratings(Title, Review)
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'))
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Воркер очереди писем: отправляет письма пачками через одно '
+        'SMTP-соединение, повторяя неудачные попытки с нарастающей паузой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить всё, что готово к отправке, и завершиться.'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Показать глубину очереди и задержку доставки.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX['BATCH_SIZE'],
+            help='Писем на одно SMTP-соединение.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EMAIL_OUTBOX['POLL_INTERVAL'],
+            help='Пауза между опросами пустой очереди, секунды.'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, value in outbox.stats().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+        while True:
+            sent = outbox.drain(options['batch_size'])
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
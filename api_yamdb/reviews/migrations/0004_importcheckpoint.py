@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Смещение в байтах')),
+                ('rows', models.BigIntegerField(default=0, verbose_name='Загружено строк')),
+                ('finished', models.BooleanField(default=False, verbose_name='Загружен полностью')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+            },
+        ),
+    ]
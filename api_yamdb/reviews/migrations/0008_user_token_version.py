@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Меняется при смене роли, имени или блокировке, отзывая выданные токены', verbose_name='Версия токенов'),
+        ),
+    ]
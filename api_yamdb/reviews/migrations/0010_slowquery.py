@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_confirmationcode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, unique=True, verbose_name='Отпечаток')),
+                ('route', models.CharField(max_length=100, verbose_name='Эндпоинт')),
+                ('sql', models.TextField(verbose_name='Пример запроса')),
+                ('plan', models.TextField(blank=True, verbose_name='План (EXPLAIN)')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='Вызовов')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Всего, мс')),
+                ('max_ms', models.FloatField(db_index=True, default=0, verbose_name='Максимум, мс')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-max_ms',),
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_catalogueversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято воркером'),
+        ),
+    ]
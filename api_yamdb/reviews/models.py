@@ -1,14 +1,14 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import ASCIIUsernameValidator
-from django.core.validators import MinLengthValidator
 
 from .validators import (
     check_score,
     not_me_username_validation,
     check_year_validation
 )
-from api_yamdb.settings import CODE_LENGTH, EMAIL_LENGTH, USERNAME_LENGTH
+from api_yamdb.settings import EMAIL_LENGTH, USERNAME_LENGTH
 
 
 class User(AbstractUser):
@@ -56,14 +56,27 @@ class User(AbstractUser):
         verbose_name='досье',
         help_text='Расскажите о себе'
     )
-    confirmation_code = models.CharField(
-        max_length=CODE_LENGTH,
-        blank=True,
-        null=True,
-        validators=[MinLengthValidator(CODE_LENGTH)],
-        verbose_name='Код подтверждения'
+    token_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Версия токенов',
+        help_text='Меняется при смене роли, имени или блокировке, '
+                  'отзывая выданные токены'
     )
 
+    # Утверждения access-токена (api.authentication). Их смена
+    # и блокировка пользователя меняют версию токенов.
+    TOKEN_CLAIMS = ('username', 'role', 'is_staff')
+    TOKEN_CLAIM_FIELDS = TOKEN_CLAIMS + ('is_active',)
+
+    def save(self, *args, **kwargs):
+        # Версию токенов меняет pre_save (reviews.signals): при частичном
+        # сохранении полей из токена она должна попасть в UPDATE.
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is not None
+                and set(update_fields) & set(self.TOKEN_CLAIM_FIELDS)):
+            kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+
     @property
     def is_user(self):
         return self.role == self.USER_ROLE
@@ -88,6 +101,25 @@ class User(AbstractUser):
         ]
 
 
+class TokenUser(User):
+    """
+    Пользователь, собранный из утверждений токена: заполнены только
+    id, username, роль и флаги, поэтому сохранение затёрло бы остальные
+    поля строки. Для записи загрузите пользователя из базы.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise TypeError(
+            'Пользователь из токена не сохраняется: загрузите его из базы.')
+
+    def delete(self, *args, **kwargs):
+        raise TypeError(
+            'Пользователь из токена не удаляется: загрузите его из базы.')
+
+
 class CategoryGenre(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название')
     slug = models.SlugField(max_length=50, unique=True)
@@ -120,6 +152,7 @@ class Title(models.Model):
     )
     year = models.IntegerField(
         validators=[check_year_validation],
+        db_index=True,
         verbose_name='Год',
         help_text='Введите дату выхода произведения'
     )
@@ -142,6 +175,19 @@ class Title(models.Model):
         verbose_name='Жанр',
         help_text='Выберите жанр произведения'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок'
+    )
+    rating = models.FloatField(
+        null=True,
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -186,6 +232,16 @@ class Review(CommentReview):
     class Meta(CommentReview.Meta):
         verbose_name = 'Обзор'
         verbose_name_plural = 'Обзоры'
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+            # Выгрузка с `since=` идёт по всем произведениям.
+            models.Index(
+                fields=['pub_date', 'id'], name='review_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'], name='unique_review'
@@ -219,6 +275,174 @@ class Comment(CommentReview):
     class Meta(CommentReview.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+            # Выгрузка с `since=` идёт по всем произведениям.
+            models.Index(
+                fields=['pub_date', 'id'], name='comment_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:30]
+
+
+class ImportCheckpoint(models.Model):
+    filename = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Файл'
+    )
+    offset = models.BigIntegerField(
+        default=0,
+        verbose_name='Смещение в байтах'
+    )
+    rows = models.BigIntegerField(
+        default=0,
+        verbose_name='Загружено строк'
+    )
+    finished = models.BooleanField(
+        default=False,
+        verbose_name='Загружен полностью'
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        return f'{self.filename}: {self.rows}'
+
+
+class CatalogueVersion(models.Model):
+    """
+    Версия пространства ответов каталога (см. api.cache). Меняется
+    при каждой записи, от которой зависят ответы пространства, и служит
+    основой ETag независимо от того, включён ли кэш ответов.
+    """
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Пространство'
+    )
+    version = models.CharField(max_length=32, verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версии каталога'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст')
+    recipient = models.EmailField(
+        max_length=EMAIL_LENGTH,
+        verbose_name='Получатель'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Поставлено в очередь'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    failed = models.BooleanField(
+        default=False,
+        verbose_name='Доставка прекращена'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взято воркером'
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outgoing_email_pending_idx',
+                condition=models.Q(sent_at__isnull=True, failed=False)
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class ConfirmationCode(models.Model):
+    """
+    Код подтверждения хранится отдельно от строки пользователя:
+    только HMAC кода и срок действия, не больше одного кода на пользователя.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='confirmation_code',
+        verbose_name='Пользователь'
+    )
+    code_hash = models.CharField(max_length=40, verbose_name='Хэш кода')
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Действует до'
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user_id}: до {self.expires_at}'
+
+
+class SlowQuery(models.Model):
+    """
+    Медленный SQL-запрос, сгруппированный по отпечатку (текст запроса
+    без значений). Хранятся только худшие SLOW_QUERIES['SIZE'] отпечатков.
+    """
+    fingerprint = models.CharField(
+        max_length=32,
+        unique=True,
+        verbose_name='Отпечаток'
+    )
+    route = models.CharField(max_length=100, verbose_name='Эндпоинт')
+    sql = models.TextField(verbose_name='Пример запроса')
+    plan = models.TextField(blank=True, verbose_name='План (EXPLAIN)')
+    calls = models.PositiveIntegerField(default=0, verbose_name='Вызовов')
+    total_ms = models.FloatField(default=0, verbose_name='Всего, мс')
+    max_ms = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Максимум, мс'
+    )
+    last_seen = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Последний раз'
+    )
+
+    class Meta:
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+        ordering = ('-max_ms',)
+
+    def __str__(self):
+        return f'{self.route}: {self.max_ms:.1f} мс'
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import (
+    Avg, DurationField, ExpressionWrapper, F, Min, Q,
+)
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+# Текст письма с кодом подтверждения не хранится дольше, чем нужно
+# для отправки: код в открытом виде есть только в письме.
+REDACTED = '(текст удалён после отправки)'
+
+
+def enqueue(subject, message, recipient):
+    """Ставит письмо в очередь; отправляет его воркер send_emails."""
+    return OutgoingEmail.objects.create(
+        subject=subject, message=message, recipient=recipient)
+
+
+def pending():
+    return OutgoingEmail.objects.filter(sent_at__isnull=True, failed=False)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX['BACKOFF_BASE'] * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX['BACKOFF_MAX']))
+
+
+def claim(batch_size):
+    """
+    Забирает пачку писем, срок отправки которых наступил и которые не
+    взяты другим воркером. Письма упавшего воркера вернутся в очередь
+    по истечении аренды.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.EMAIL_OUTBOX['LEASE'])
+    due = pending().filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lte=expired),
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at')
+    return [email for email in due[:batch_size] if take(email, now)]
+
+
+def take(email, now):
+    """
+    Помечает письмо взятым условным UPDATE: строка обновится, только если
+    с момента чтения её никто не взял. Так из двух воркеров, прочитавших
+    одно письмо, его получит ровно один и на любой СУБД.
+    """
+    rows = OutgoingEmail.objects.filter(pk=email.pk)
+    if email.claimed_at is None:
+        rows = rows.filter(claimed_at__isnull=True)
+    else:
+        rows = rows.filter(claimed_at=email.claimed_at)
+    if not rows.update(claimed_at=now):
+        return False
+    email.claimed_at = now
+    return True
+
+
+def deliver(emails):
+    """
+    Отправляет пачку писем через одно SMTP-соединение.
+    Возвращает число доставленных писем.
+    """
+    sent = 0
+    smtp = get_connection()
+    try:
+        smtp.open()
+    except Exception as error:
+        for email in emails:
+            schedule_retry(email, error)
+        return sent
+    try:
+        for email in emails:
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    to=[email.recipient],
+                    connection=smtp
+                ).send()
+            except Exception as error:
+                schedule_retry(email, error)
+                continue
+            email.sent_at = timezone.now()
+            email.attempts += 1
+            email.message = REDACTED
+            email.save(update_fields=('sent_at', 'attempts', 'message'))
+            sent += 1
+    finally:
+        smtp.close()
+    return sent
+
+
+def schedule_retry(email, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_OUTBOX['MAX_ATTEMPTS']:
+        email.failed = True
+        email.message = REDACTED
+    else:
+        email.next_attempt_at = timezone.now() + backoff(email.attempts)
+    email.claimed_at = None
+    email.save(update_fields=(
+        'attempts', 'last_error', 'failed', 'next_attempt_at', 'message',
+        'claimed_at'))
+
+
+def redact_finished():
+    """
+    Стирает текст отправленных и брошенных писем, оставшийся с тех пор,
+    когда он не удалялся при отправке. Возвращает число писем.
+    """
+    return OutgoingEmail.objects.filter(
+        Q(sent_at__isnull=False) | Q(failed=True)
+    ).exclude(message=REDACTED).update(message=REDACTED)
+
+
+def drain(batch_size):
+    """Отправляет все письма, срок которых наступил. Возвращает их число."""
+    total = 0
+    while True:
+        emails = claim(batch_size)
+        if not emails:
+            return total
+        total += deliver(emails)
+
+
+def stats(period=timedelta(hours=1)):
+    """Глубина очереди и задержка доставки за последний `period`."""
+    now = timezone.now()
+    queue = pending().aggregate(oldest=Min('created'))
+    latency = OutgoingEmail.objects.filter(
+        sent_at__gte=now - period
+    ).aggregate(avg=Avg(ExpressionWrapper(
+        F('sent_at') - F('created'), output_field=DurationField())))
+    return {
+        'pending': pending().count(),
+        'failed': OutgoingEmail.objects.filter(failed=True).count(),
+        'oldest_pending_seconds': (
+            (now - queue['oldest']).total_seconds()
+            if queue['oldest'] else 0.0),
+        'delivery_latency_avg_seconds': (
+            latency['avg'].total_seconds() if latency['avg'] else 0.0),
+    }
@@ -0,0 +1,68 @@
+from django.db.models import (
+    Avg, Count, F, FloatField, Func, OuterRef, Q, Subquery, Sum
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+# Допустимая погрешность сравнения сохранённого среднего с пересчитанным.
+RATING_TOLERANCE = 1e-6
+
+
+def rating_expressions(sum_delta, count_delta):
+    """
+    Выражения для атомарного изменения агрегата рейтинга
+    одним UPDATE: правая часть читает старые значения строки,
+    поэтому среднее пересчитывается без дополнительного SELECT.
+    """
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('rating_count') + count_delta
+    return {
+        'rating_sum': new_sum,
+        'rating_count': new_count,
+        'rating': Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+    }
+
+
+def apply_score_change(title_model, title_id, sum_delta, count_delta):
+    if not sum_delta and not count_delta:
+        return
+    title_model.objects.filter(pk=title_id).update(
+        **rating_expressions(sum_delta, count_delta))
+
+
+def rebuild_ratings(title_model, review_model, queryset=None):
+    """Пересчитывает агрегат рейтинга по таблице отзывов."""
+    reviews = review_model.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    if queryset is None:
+        queryset = title_model.objects.all()
+    return queryset.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0),
+        rating=Subquery(reviews.annotate(avg=Avg('score')).values('avg')),
+    )
+
+
+def inconsistent_ratings(title_model):
+    """
+    Произведения, у которых сохранённый агрегат (сумма, число оценок
+    или само среднее `rating`) не сходится с отзывами.
+    """
+    return title_model.objects.annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+        actual_rating=Avg('reviews__score'),
+    ).annotate(
+        rating_error=Func(
+            F('rating') - F('actual_rating'), function='ABS',
+            output_field=FloatField()),
+    ).filter(
+        ~Q(rating_sum=F('actual_sum'))
+        | ~Q(rating_count=F('actual_count'))
+        | Q(rating_error__gt=RATING_TOLERANCE)
+        | Q(rating__isnull=True, actual_count__gt=0)
+        | Q(rating__isnull=False, actual_count=0)
+    ).order_by('pk')
@@ -0,0 +1,129 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVectorField
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.utils import OperationalError
+
+SQLITE_FTS_TABLE = 'reviews_title_fts'
+
+# Внешнее содержимое FTS5 берётся из reviews_title, триггеры держат индекс
+# в актуальном состоянии и при вставках в обход моделей (import_csv).
+# Триггер обновления срабатывает только на name/description, а не на
+# каждое изменение рейтинга.
+SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    f"name, description, content='reviews_title', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai "
+    f"AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad "
+    f"AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, "
+    f"description) VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au "
+    f"AFTER UPDATE OF name, description ON reviews_title BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, "
+    f"description) VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_DROP = (
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+)
+
+POSTGRES_VECTOR = (
+    "to_tsvector('simple', coalesce({table}name, '') || ' ' "
+    "|| coalesce({table}description, ''))"
+)
+POSTGRES_CREATE = (
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx ON reviews_title '
+    'USING GIN ({})'.format(POSTGRES_VECTOR.format(table='')),
+)
+POSTGRES_DROP = ('DROP INDEX IF EXISTS reviews_title_search_idx',)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Полнотекстовый индекс по name/description: FTS5 на SQLite,
+    GIN по tsvector на Postgres. Если SQLite собран без FTS5,
+    поиск работает через icontains.
+    """
+    statements = {
+        'sqlite': SQLITE_CREATE,
+        'postgresql': POSTGRES_CREATE,
+    }.get(schema_editor.connection.vendor, ())
+    try:
+        for statement in statements:
+            schema_editor.execute(statement)
+    except OperationalError:
+        if schema_editor.connection.vendor != 'sqlite':
+            raise
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_DROP,
+        'postgresql': POSTGRES_DROP,
+    }.get(schema_editor.connection.vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def has_sqlite_fts(connection):
+    if not hasattr(connection, 'title_fts_available'):
+        with connection.cursor() as cursor:
+            connection.title_fts_available = (
+                SQLITE_FTS_TABLE in connection.introspection.table_names(
+                    cursor))
+    return connection.title_fts_available
+
+
+def fts_query(value):
+    """
+    Пользовательский ввод -> запрос FTS5: каждое слово берётся в кавычки
+    (спецсимволы FTS не интерпретируются) и ищется по префиксу.
+    """
+    words = value.replace('"', ' ').split()
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def tsquery(value):
+    """
+    Пользовательский ввод -> запрос to_tsquery: из ввода берутся только
+    слова (операторы tsquery не интерпретируются), каждое ищется
+    по префиксу, все слова обязательны.
+    """
+    return ' & '.join(f"'{word}':*" for word in re.findall(r'\w+', value))
+
+
+def search_titles(queryset, value):
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and has_sqlite_fts(connection):
+        query = fts_query(value)
+        if not query:
+            return queryset
+        # RawSQL в id__in превратился бы в IN ((...)), который SQLite
+        # читает как скалярный подзапрос и возвращает одну строку.
+        return queryset.extra(
+            where=[f'"reviews_title"."id" IN (SELECT rowid FROM '
+                   f'{SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s)'],
+            params=[query])
+    if connection.vendor == 'postgresql':
+        query = tsquery(value)
+        if not query:
+            return queryset
+        # Выражение совпадает с индексным, поэтому используется GIN-индекс.
+        vector = RawSQL(POSTGRES_VECTOR.format(table='"reviews_title".'), [],
+                        output_field=SearchVectorField())
+        return queryset.annotate(search_vector=vector).filter(
+            search_vector=SearchQuery(
+                query, config='simple', search_type='raw'))
+    return queryset.filter(
+        Q(name__icontains=value) | Q(description__icontains=value))
@@ -0,0 +1,56 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Review, Title, User
+from .ratings import apply_score_change
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = Review.objects.filter(
+            pk=instance.pk).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        apply_score_change(Title, instance.title_id, instance.score, 1)
+        return
+    previous_title_id, previous_score = previous
+    if previous_title_id != instance.title_id:
+        apply_score_change(Title, previous_title_id, -previous_score, -1)
+        apply_score_change(Title, instance.title_id, instance.score, 1)
+        return
+    apply_score_change(
+        Title, instance.title_id, instance.score - previous_score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    apply_score_change(Title, instance.title_id, -instance.score, -1)
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Увеличивает версию токенов при смене полей из токена и запоминает
+    прежний username в `_previous_username` (для сброса кэша).
+    """
+    instance._previous_username = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not set(update_fields) & set(User.TOKEN_CLAIM_FIELDS)):
+        return
+    previous = User.objects.filter(pk=instance.pk).values(
+        *User.TOKEN_CLAIM_FIELDS, 'token_version').first()
+    if previous is None:
+        return
+    instance._previous_username = previous['username']
+    # Версия берётся из базы, а не из объекта: иначе устаревший объект
+    # откатил бы её при сохранении.
+    instance.token_version = previous['token_version'] + any(
+        previous[field] != getattr(instance, field)
+        for field in User.TOKEN_CLAIM_FIELDS)
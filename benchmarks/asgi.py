@@ -0,0 +1,161 @@
+"""
+Бенчмарк чтения каталога медленными клиентами: ASGI (asgi.py) против
+синхронного WSGI (wsgi.py) при одинаковом числе потоков.
+
+    python benchmarks/asgi.py --connections 1000 --threads 32 --delay 0.2
+
+Сеть моделируется в процессе: каждый из `--connections` одновременных
+клиентов тратит `--delay` секунд на передачу запроса и приём ответа.
+WSGI-сервер с потоками (как gunicorn --threads) держит поток всё это
+время, ASGI-приложение — только пока Django обрабатывает запрос.
+Запросы — GET списков и объектов /titles/, /categories/, /genres/,
+отзывов и комментариев; выводятся p50/p95/p99 задержки и RPS.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_django  # noqa: E402
+
+
+def catalogue_url(ctx, rand):
+    title = ctx.title(rand)
+    return rand.choice((
+        f'/api/v1/titles/?limit=20&offset={rand.randrange(ctx.titles - 20)}',
+        f'/api/v1/titles/{title}/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        f'/api/v1/titles/{title}/reviews/',
+        f'/api/v1/titles/{ctx.hot_title}/reviews/{ctx.hot_review}/comments/',
+    ))
+
+
+def scope(url):
+    path, _, query = url.partition('?')
+    return {'type': 'http', 'method': 'GET', 'path': path,
+            'query_string': query.encode(), 'headers': []}
+
+
+def run_wsgi(application, requests, threads, delay):
+    from api_yamdb.asgi_handler import environ
+
+    def handle(url, accepted):
+        time.sleep(delay / 2)  # клиент передаёт запрос
+        statuses = []
+        result = application(
+            environ(scope(url), b''),
+            lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            b''.join(result)
+        finally:
+            result.close()
+        time.sleep(delay / 2)  # клиент принимает ответ
+        return time.perf_counter() - accepted, statuses[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(handle, url, started) for url in requests]
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - started
+
+
+def run_asgi(application, requests, delay):
+    async def handle(url, accepted):
+        status = []
+
+        async def receive():
+            await asyncio.sleep(delay / 2)
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(delay / 2)
+
+        await application(scope(url), receive, send)
+        return time.perf_counter() - accepted, status[0]
+
+    async def main():
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(handle(url, started) for url in requests))
+        return results, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def report(name, results, elapsed):
+    timings = sorted(seconds * 1000 for seconds, _ in results)
+
+    def percentile(share):
+        return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+    errors = sum(1 for _, status in results if str(status)[0] != '2')
+    print(f'{name:6} {percentile(0.5):9.0f} {percentile(0.95):9.0f} '
+          f'{percentile(0.99):9.0f} {len(results) / elapsed:8.1f} '
+          f'{errors:7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--delay', type=float, default=0.2,
+                        help='Время передачи запроса и ответа клиентом, с.')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--db',
+        default=os.path.join(tempfile.gettempdir(), 'yamdb_asgi.sqlite3'))
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    # Один процесс: кэш каталога на LocMem корректен.
+    os.environ.setdefault('CATALOGUE_CACHE_ENABLED', '1')
+    setup_django(args.db)
+    from django.core.management import call_command
+    from django.core.wsgi import get_wsgi_application
+
+    from api.cache import invalidate_all
+    from api_yamdb.asgi_handler import ASGIHandler
+    from benchmarks.load import Context
+    from benchmarks.seed import seed
+    from reviews.csv_import import reset_sequences
+
+    call_command('migrate', verbosity=0)
+    seed(users=args.users, titles=args.titles, reviews=args.reviews,
+         comments=args.comments, seed_value=args.seed, skew=1.0)
+    reset_sequences()
+    ctx = Context(args.users, args.titles, clients=0)
+    rand = random.Random(args.seed)
+    requests = [catalogue_url(ctx, rand) for _ in range(args.connections)]
+    wsgi = get_wsgi_application()
+
+    print(f'{args.connections} одновременных клиентов, {args.threads} '
+          f'потоков, {args.delay * 1000:.0f} мс на передачу')
+    print(f'\n{"":6} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+          f'{"RPS":>8} {"ошибок":>7}')
+    for name, run in (
+            ('WSGI', lambda: run_wsgi(
+                wsgi, requests, args.threads, args.delay)),
+            ('ASGI', lambda: run_asgi(
+                ASGIHandler(wsgi, args.threads), requests, args.delay))):
+        # Оба прогона начинают с пустым кэшем каталога.
+        invalidate_all()
+        report(name, *run())
+
+
+if __name__ == '__main__':
+    main()
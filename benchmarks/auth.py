@@ -0,0 +1,116 @@
+"""
+Бенчмарк аутентификации: накладные расходы на запрос к отзывам
+и комментариям по этапам — проверка подписи, загрузка пользователя,
+проверка прав — и целиком для каждого аутентификатора.
+
+    python benchmarks/auth.py --repeat 2000
+
+База создаётся заново в отдельном файле (по умолчанию во временном
+каталоге), рабочая db.sqlite3 не затрагивается.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, setup_django  # noqa: E402
+
+
+def stages(user, review):
+    """Этапы обработки токена по отдельности."""
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import PreparedKeyAccessToken, token_for_user
+    from api.permissions import IsAuthorAdminModeratorOrReadOnly
+
+    raw = str(AccessToken.for_user(user)).encode()
+    validated = AccessToken(raw)
+    request = APIRequestFactory().patch('/')
+    request.user = user
+    permission = IsAuthorAdminModeratorOrReadOnly()
+    claims_token = PreparedKeyAccessToken(str(token_for_user(user)).encode())
+    return {
+        'подпись: AccessToken': lambda: AccessToken(raw),
+        'подпись: PreparedKeyAccessToken':
+            lambda: PreparedKeyAccessToken(raw),
+        'пользователь: из базы':
+            lambda: JWTAuthentication().get_user(validated),
+        'пользователь: из утверждений (версия в кэше)':
+            lambda: _claims_user(claims_token),
+        'права: has_object_permission':
+            lambda: permission.has_object_permission(request, None, review),
+    }
+
+
+def _claims_user(token):
+    from api.authentication import ClaimsJWTAuthentication
+    return ClaimsJWTAuthentication().get_user(token)
+
+
+def authenticators(user):
+    """Полная аутентификация запроса с заголовком Authorization."""
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import (
+        CachedJWTAuthentication, ClaimsJWTAuthentication, token_for_user
+    )
+
+    def request(token):
+        return APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    plain = request(AccessToken.for_user(user))
+    claims = request(token_for_user(user))
+    return {
+        'JWTAuthentication': lambda: JWTAuthentication().authenticate(plain),
+        'ClaimsJWTAuthentication':
+            lambda: ClaimsJWTAuthentication().authenticate(claims),
+        'CachedJWTAuthentication':
+            lambda: CachedJWTAuthentication().authenticate(claims),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument(
+        '--db',
+        default=os.path.join(tempfile.gettempdir(), 'yamdb_auth.sqlite3'))
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    setup_django(args.db)
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from reviews.models import Review, Title, User
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(
+        username='bench', email='bench@yamdb.fake', role='moderator')
+    review = Review.objects.create(
+        title=Title.objects.create(name='Произведение', year=2000),
+        author=user, text='текст', score=5)
+
+    print(f'{"этап / аутентификатор":46} {"мкс":>10} {"запросов":>9}')
+    for group in (stages(user, review), authenticators(user)):
+        for name, func in group.items():
+            func()
+            with CaptureQueriesContext(connection) as context:
+                func()
+            micros = measure(func, args.repeat) * 1000
+            print(f'{name:46} {micros:10.1f} '
+                  f'{len(context.captured_queries):9}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'api_yamdb')
+
+
+def setup_django(db_name=None):
+    """
+    Настраивает Django для скрипта бенчмарка. Если передан `db_name`,
+    SQLite-база по умолчанию подменяется отдельным файлом, чтобы не
+    трогать рабочую db.sqlite3.
+    """
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    from django.conf import settings
+    if db_name is not None:
+        settings.DATABASES['default']['NAME'] = db_name
+    django.setup()
+
+
+def measure(func, repeat=20):
+    """Медианное время вызова в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
@@ -0,0 +1,103 @@
+"""
+Бенчмарк индексов каталога: планы и время запросов фильтров TitleFilter
+и вложенных списков отзывов/комментариев до и после миграции с индексами.
+
+    python benchmarks/indexes.py --reviews 1000000
+
+База создаётся заново в отдельном файле (по умолчанию во временном
+каталоге), рабочая db.sqlite3 не затрагивается.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, setup_django  # noqa: E402
+
+BEFORE_INDEXES = '0004_importcheckpoint'
+
+
+def catalogue_queries():
+    from api.filters import TitleFilter
+    from reviews.models import Comment, Review, Title
+
+    title_id = Review.objects.order_by().values_list(
+        'title_id', flat=True).first()
+    review_id = Comment.objects.order_by().values_list(
+        'review_id', flat=True).first()
+    titles = Title.objects.all()
+    return {
+        'reviews: title_id, -pub_date':
+            Review.objects.filter(title_id=title_id)[:100],
+        'reviews: cursor (-pub_date, -id)':
+            Review.objects.filter(title_id=title_id).order_by(
+                '-pub_date', '-id')[:100],
+        'comments: review_id, -pub_date':
+            Comment.objects.filter(review_id=review_id)[:100],
+        'titles: ?year=':
+            TitleFilter({'year': '2000'}, queryset=titles).qs[:100],
+        'titles: ?genre=':
+            TitleFilter({'genre': 'genre1'}, queryset=titles).qs[:100],
+        'titles: ?category=':
+            TitleFilter({'category': 'category1'}, queryset=titles).qs[:100],
+        'titles: ordering=rating':
+            titles.order_by('rating')[:100],
+    }
+
+
+def run(repeat):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    results = {}
+    for name, queryset in catalogue_queries().items():
+        results[name] = (
+            measure(lambda: list(queryset.all()), repeat),
+            queryset.explain(),
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument(
+        '--db',
+        default=os.path.join(tempfile.gettempdir(), 'yamdb_bench.sqlite3'))
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    setup_django(args.db)
+    from django.core.management import call_command
+    from benchmarks.seed import seed
+
+    call_command('migrate', verbosity=0)
+    call_command('migrate', 'reviews', BEFORE_INDEXES, verbosity=0)
+    print(f'Наполнение: {args.reviews} отзывов, {args.comments} комментариев')
+    seed(users=args.users, titles=args.titles, reviews=args.reviews,
+         comments=args.comments)
+    before = run(args.repeat)
+    call_command('migrate', 'reviews', verbosity=0)
+    after = run(args.repeat)
+
+    print(f'\n{"запрос":36} {"до, мс":>10} {"после, мс":>10}')
+    for name, (before_ms, _) in before.items():
+        print(f'{name:36} {before_ms:10.2f} {after[name][0]:10.2f}')
+    for name in before:
+        print(f'\n{name}')
+        for label, plan in (('до', before[name][1]),
+                            ('после', after[name][1])):
+            print(f'  {label}:')
+            for line in plan.splitlines():
+                print(f'    {line}')
+
+
+if __name__ == '__main__':
+    main()
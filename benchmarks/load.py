@@ -0,0 +1,246 @@
+"""
+Нагрузочный тест API на синтетической базе с перекосом данных.
+
+    python benchmarks/load.py --mix mixed --requests 5000 --workers 4
+
+Запросы выполняются в процессе через тестовый клиент Django, без сети:
+для каждого эндпоинта выводятся p50/p95/p99 задержки, среднее число
+SQL-запросов на запрос и общая пропускная способность (RPS).
+
+По умолчанию база создаётся заново в отдельном SQLite-файле. С `--db
+default` используется база из настроек проекта (например, PostgreSQL):
+она очищается командой flush и наполняется заново.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_django  # noqa: E402
+
+# Сценарий: (вес, метка, функция). Функция получает контекст прогона
+# и генератор случайных чисел потока и готовит запрос: возвращает вызов
+# без аргументов, который и замеряется.
+MIXES = {
+    'browse': (
+        (40, 'GET titles/', lambda ctx, rand: partial(
+            ctx.anon.get, '/api/v1/titles/', {
+                'limit': 20,
+                'offset': rand.randrange(max(ctx.titles - 20, 1))})),
+        (20, 'GET titles/{id}/', lambda ctx, rand: partial(
+            ctx.anon.get, f'/api/v1/titles/{ctx.title(rand)}/')),
+        (25, 'GET titles/{id}/reviews/', lambda ctx, rand: partial(
+            ctx.anon.get, f'/api/v1/titles/{ctx.title(rand)}/reviews/',
+            {'pagination': 'cursor'})),
+        (15, 'GET .../comments/', lambda ctx, rand: partial(
+            ctx.anon.get, f'/api/v1/titles/{ctx.hot_title}/reviews/'
+                          f'{ctx.hot_review}/comments/')),
+    ),
+    'write': (
+        (60, 'POST .../comments/', lambda ctx, rand: partial(
+            ctx.client(rand).post,
+            f'/api/v1/titles/{ctx.hot_title}/reviews/'
+            f'{ctx.hot_review}/comments/', {'text': 'Комментарий'})),
+        (40, 'POST titles/{id}/reviews/', lambda ctx, rand: partial(
+            ctx.client(rand).post,
+            f'/api/v1/titles/{ctx.title(rand)}/reviews/',
+            {'text': 'Отзыв', 'score': rand.randint(1, 10)})),
+    ),
+    'auth': (
+        (50, 'POST auth/signup/', lambda ctx, rand: partial(
+            ctx.anon.post, '/api/v1/auth/signup/', ctx.signup_data())),
+        (50, 'POST auth/token/', lambda ctx, rand: partial(
+            ctx.anon.post, '/api/v1/auth/token/', ctx.token_data(rand))),
+    ),
+    'users': (
+        (50, 'GET users/', lambda ctx, rand: partial(
+            ctx.admin.get, '/api/v1/users/', {'limit': 20})),
+        (50, 'GET users/me/', lambda ctx, rand: partial(
+            ctx.client(rand).get, '/api/v1/users/me/')),
+    ),
+}
+MIX_WEIGHTS = {'browse': 70, 'write': 15, 'auth': 5, 'users': 10}
+MIXES['mixed'] = tuple(
+    (weight * MIX_WEIGHTS[name], label, func)
+    for name, scenarios in list(MIXES.items())
+    for weight, label, func in scenarios
+)
+
+
+class Context:
+    """Клиенты и идентификаторы, общие для всех потоков прогона."""
+
+    def __init__(self, users, titles, clients):
+        from django.db.models import Count
+        from rest_framework.test import APIClient
+
+        from api.authentication import token_for_user
+        from reviews.models import Review, Title, User
+
+        self.users = users
+        self.titles = titles
+        self.anon = APIClient()
+        admin = User.objects.create_user(
+            username='load-admin', email='load-admin@yamdb.fake',
+            role=User.ADMIN_ROLE)
+        self.admin = self.authorized(APIClient(), token_for_user(admin))
+        self.clients = [
+            self.authorized(APIClient(), token_for_user(user))
+            for user in User.objects.filter(role=User.USER_ROLE)[:clients]
+        ]
+        self.hot_title = Title.objects.order_by('-rating_count').values_list(
+            'id', flat=True).first()
+        self.hot_review = Review.objects.annotate(
+            comments_count=Count('comments')
+        ).order_by('-comments_count').values_list('id', flat=True).first()
+        self.signups = iter(range(10 ** 9))
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def authorized(client, token):
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def client(self, rand):
+        return rand.choice(self.clients)
+
+    def title(self, rand):
+        # Популярные произведения запрашиваются чаще.
+        return int(self.titles * rand.random() ** 2) + 1
+
+    def signup_data(self):
+        with self.lock:
+            number = next(self.signups)
+        return {'username': f'load{number}',
+                'email': f'load{number}@yamdb.fake'}
+
+    def token_data(self, rand):
+        """Код выдаётся вне замера: он хранится только в виде хэша."""
+        from reviews import confirmation
+        from reviews.models import User
+
+        user = User(pk=rand.randint(1, self.users))
+        user.username = f'user{user.pk}'
+        return {'username': user.username,
+                'confirmation_code': confirmation.issue(user)}
+
+
+def run_worker(ctx, scenarios, count, seed_value):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    rand = random.Random(seed_value)
+    weights = [weight for weight, _, _ in scenarios]
+    samples = []
+    try:
+        for _ in range(count):
+            _, label, prepare = rand.choices(scenarios, weights)[0]
+            request = prepare(ctx, rand)
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request()
+                elapsed = time.perf_counter() - started
+            samples.append((label, elapsed * 1000,
+                            len(context.captured_queries),
+                            response.status_code))
+    finally:
+        connection.close()
+    return samples
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def report(samples, elapsed):
+    by_label = defaultdict(list)
+    for label, millis, queries, status_code in samples:
+        by_label[label].append((millis, queries, status_code))
+    print(f'\n{"эндпоинт":28} {"n":>6} {"p50, мс":>8} {"p95, мс":>8} '
+          f'{"p99, мс":>8} {"SQL/запр":>9} {"ошибок":>7}')
+    for label, rows in sorted(by_label.items()):
+        timings = sorted(millis for millis, _, _ in rows)
+        print(f'{label:28} {len(rows):6} '
+              f'{percentile(timings, 0.5):8.2f} '
+              f'{percentile(timings, 0.95):8.2f} '
+              f'{percentile(timings, 0.99):8.2f} '
+              f'{statistics.mean(q for _, q, _ in rows):9.1f} '
+              f'{sum(1 for _, _, code in rows if code >= 400):7}')
+    print(f'\nвсего {len(samples)} запросов за {elapsed:.1f} с: '
+          f'{len(samples) / elapsed:.1f} RPS')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=100,
+                        help='Пользователей с токенами для записи.')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--skew', type=float, default=1.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--db',
+        default=os.path.join(tempfile.gettempdir(), 'yamdb_load.sqlite3'),
+        help='Файл SQLite или `default` для базы из настроек.')
+    args = parser.parse_args()
+
+    # Один процесс: кэш каталога на LocMem корректен.
+    os.environ.setdefault('CATALOGUE_CACHE_ENABLED', '1')
+    # Измеряется приложение, а не ограничение частоты /auth/.
+    os.environ.setdefault('AUTH_THROTTLE_IP_RATE', '1000000/s')
+    os.environ.setdefault('AUTH_THROTTLE_USERNAME_RATE', '1000000/s')
+    use_default = args.db == 'default'
+    if not use_default and os.path.exists(args.db):
+        os.remove(args.db)
+    setup_django(None if use_default else args.db)
+    # Ожидаемые 4xx (повторный отзыв) не должны засорять вывод.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    from django.core.management import call_command
+
+    from api.cache import invalidate_all
+    from benchmarks.seed import seed
+    from reviews.csv_import import reset_sequences
+
+    call_command('migrate', verbosity=0)
+    if use_default:
+        call_command('flush', interactive=False, verbosity=0)
+    print(f'Наполнение: {args.users} пользователей, {args.titles} '
+          f'произведений, {args.reviews} отзывов, {args.comments} '
+          f'комментариев, skew={args.skew}')
+    seed(users=args.users, titles=args.titles, reviews=args.reviews,
+         comments=args.comments, seed_value=args.seed, skew=args.skew)
+    reset_sequences()
+    invalidate_all()
+    ctx = Context(args.users, args.titles, args.clients)
+
+    scenarios = MIXES[args.mix]
+    per_worker = [
+        args.requests // args.workers + (i < args.requests % args.workers)
+        for i in range(args.workers)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(
+            run_worker, [ctx] * args.workers, [scenarios] * args.workers,
+            per_worker, range(args.seed, args.seed + args.workers))
+        samples = [sample for result in results for sample in result]
+    report(samples, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()
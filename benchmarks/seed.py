@@ -0,0 +1,154 @@
+import datetime as dt
+import random
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 10000
+
+
+def bulk_insert(table, columns, rows):
+    """Вставка пачками через executemany, минуя модели и сигналы."""
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(table),
+        ', '.join(quote(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+
+
+def review_counts(titles, users, reviews, skew):
+    """
+    Число отзывов у каждого произведения по закону Ципфа с показателем
+    `skew`: первое произведение самое популярное. Отзывов у произведения
+    не больше `users` (пара title, author уникальна), излишек переходит
+    к следующим.
+    """
+    weights = [1 / rank ** skew for rank in range(1, titles + 1)]
+    total = sum(weights)
+    counts = []
+    left = reviews
+    for rank, weight in enumerate(weights):
+        count = min(users, left, round(reviews * weight / total))
+        counts.append(count)
+        left -= count
+    rank = 0
+    while left:
+        extra = min(users - counts[rank], left)
+        counts[rank] += extra
+        left -= extra
+        rank += 1
+    return counts
+
+
+def random_pub_date(rand, now):
+    return (now - dt.timedelta(
+        seconds=rand.randint(0, 10 * 365 * 86400))).isoformat()
+
+
+def review_rows(rand, now, users, reviews):
+    # Отзыв с номером i пишет автор i % users для произведения
+    # i // users: пары (title, author) не повторяются.
+    for i in range(reviews):
+        yield (i + 1, i // users + 1, i % users + 1, 'Отзыв',
+               rand.randint(1, 10), random_pub_date(rand, now))
+
+
+def skewed_review_rows(rand, now, titles, users, reviews, skew):
+    # Авторы отзывов одного произведения идут подряд со случайного
+    # сдвига, поэтому пары (title, author) не повторяются.
+    review_id = 0
+    counts = review_counts(titles, users, reviews, skew)
+    for title, count in enumerate(counts, start=1):
+        offset = rand.randrange(users)
+        for k in range(count):
+            review_id += 1
+            yield (review_id, title, (offset + k) % users + 1, 'Отзыв',
+                   rand.randint(1, 10), random_pub_date(rand, now))
+
+
+def insert_users(users, joined):
+    columns = ['id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name', 'password', 'is_superuser', 'is_staff',
+               'is_active', 'date_joined']
+    extra = []
+    # Бенчмарк индексов откатывает миграции, где token_version ещё нет.
+    with connection.cursor() as cursor:
+        if 'token_version' in {
+            column.name for column in connection.introspection
+            .get_table_description(cursor, 'reviews_user')
+        }:
+            columns.append('token_version')
+            extra.append(0)
+    bulk_insert(
+        'reviews_user', columns,
+        ((i, f'user{i}', f'user{i}@yamdb.fake', 'user', '', '', '',
+          '!', False, False, True, joined, *extra)
+         for i in range(1, users + 1)))
+
+
+def seed(users=1000, titles=1000, reviews=100000, comments=100000,
+         genres=20, categories=5, seed_value=0, skew=0.0):
+    """
+    Наполняет пустую базу синтетическими данными. Пары (title, author)
+    у отзывов уникальны, поэтому `reviews` не может превышать
+    `users * titles`. При `skew` > 0 отзывы распределены по произведениям
+    по закону Ципфа, а комментарии сосредоточены на первых отзывах:
+    например, 1 000 000 отзывов при `skew=1.2` и 100 000 пользователей
+    дают несколько произведений по 100 000 отзывов.
+    """
+    from reviews.models import Review, Title
+    from reviews.ratings import rebuild_ratings
+
+    if reviews > users * titles:
+        raise ValueError('reviews не может превышать users * titles')
+    rand = random.Random(seed_value)
+    now = timezone.now()
+
+    insert_users(users, now.isoformat())
+    for table, count in (('reviews_category', categories),
+                         ('reviews_genre', genres)):
+        bulk_insert(
+            table, ('id', 'name', 'slug'),
+            ((i, f'{table} {i}', f'{table[8:]}{i}')
+             for i in range(1, count + 1)))
+    bulk_insert(
+        'reviews_title',
+        ('id', 'name', 'year', 'description', 'category_id',
+         'rating_sum', 'rating_count'),
+        ((i, f'Произведение {i}', rand.randint(1900, 2022), '',
+          rand.randint(1, categories), 0, 0)
+         for i in range(1, titles + 1)))
+    bulk_insert(
+        'reviews_title_genre', ('title_id', 'genre_id'),
+        ((title, genre)
+         for title in range(1, titles + 1)
+         for genre in rand.sample(range(1, genres + 1), min(2, genres))))
+
+    def comment_review():
+        if skew:
+            return int(reviews * rand.random() ** (1 + skew)) + 1
+        return rand.randint(1, reviews)
+
+    bulk_insert(
+        'reviews_review',
+        ('id', 'title_id', 'author_id', 'text', 'score', 'pub_date'),
+        skewed_review_rows(rand, now, titles, users, reviews, skew)
+        if skew else review_rows(rand, now, users, reviews))
+    bulk_insert(
+        'reviews_comment',
+        ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+        ((i, comment_review(), rand.randint(1, users),
+          'Комментарий', random_pub_date(rand, now))
+         for i in range(1, comments + 1)) if reviews else ())
+    rebuild_ratings(Title, Review)
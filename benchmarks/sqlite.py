@@ -0,0 +1,124 @@
+"""
+Бенчмарк профиля SQLite: одновременные чтение и запись с PRAGMA из
+SQLITE_PRAGMAS (WAL, synchronous=NORMAL, …) и без них.
+
+    python benchmarks/sqlite.py --readers 4 --writers 4 --duration 10
+
+Для каждого профиля база создаётся заново в отдельном файле. Читатели
+выполняют сценарии `browse` нагрузочного теста, писатели — `write`;
+кэш каталога отключён, чтобы чтения доходили до базы. Выводится число
+успешных операций в секунду и число ошибок (в том числе `database is
+locked`).
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_django  # noqa: E402
+from benchmarks.load import MIXES, Context  # noqa: E402
+
+PROFILES = ('без PRAGMA', 'SQLITE_PRAGMAS')
+
+
+def run_worker(ctx, scenarios, deadline, seed_value):
+    from django.db import OperationalError, connection
+
+    rand = random.Random(seed_value)
+    weights = [weight for weight, _, _ in scenarios]
+    done = errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            _, _, prepare = rand.choices(scenarios, weights)[0]
+            request = prepare(ctx, rand)
+            try:
+                status_code = request().status_code
+            except OperationalError:
+                status_code = 500
+            if status_code >= 500:
+                errors += 1
+            else:
+                done += 1
+    finally:
+        connection.close()
+    return done, errors
+
+
+def run(profile, pragmas, args):
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    from api.cache import invalidate_all
+    from benchmarks.seed import seed
+    from reviews.csv_import import reset_sequences
+
+    path = os.path.join(
+        tempfile.gettempdir(), f'yamdb_sqlite_{profile}.sqlite3')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    connections.close_all()
+    # Соединения потоков создаются заново и получают новые настройки.
+    settings.DATABASES['default'].update(NAME=path, PRAGMAS=pragmas)
+    call_command('migrate', verbosity=0)
+    seed(users=args.users, titles=args.titles, reviews=args.reviews,
+         comments=args.comments, seed_value=args.seed, skew=1.0)
+    reset_sequences()
+    invalidate_all()
+    ctx = Context(args.users, args.titles, args.clients)
+    connections.close_all()
+
+    workers = ([MIXES['browse']] * args.readers
+               + [MIXES['write']] * args.writers)
+    deadline = time.perf_counter() + args.duration
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        results = list(executor.map(
+            run_worker, [ctx] * len(workers), workers,
+            [deadline] * len(workers),
+            range(args.seed, args.seed + len(workers))))
+    reads = results[:args.readers]
+    writes = results[args.readers:]
+    return (sum(done for done, _ in reads) / args.duration,
+            sum(done for done, _ in writes) / args.duration,
+            sum(errors for _, errors in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Длительность прогона профиля, с.')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('CATALOGUE_CACHE_ENABLED', '0')
+    os.environ.setdefault('AUTH_THROTTLE_IP_RATE', '1000000/s')
+    os.environ.setdefault('AUTH_THROTTLE_USERNAME_RATE', '1000000/s')
+    setup_django()
+    from api_yamdb.database import SQLITE_PRAGMAS
+
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    print(f'{args.readers} читателей, {args.writers} писателей, '
+          f'{args.duration:.0f} с на профиль')
+    print(f'\n{"профиль":16} {"чтений/с":>9} {"записей/с":>10} {"ошибок":>7}')
+    for number, (profile, pragmas) in enumerate(
+            zip(PROFILES, ({}, SQLITE_PRAGMAS))):
+        reads, writes, errors = run(number, pragmas, args)
+        print(f'{profile:16} {reads:9.1f} {writes:10.1f} {errors:7}')
+
+
+if __name__ == '__main__':
+    main()
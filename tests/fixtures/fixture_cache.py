@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import caches
+
+from api.authentication import token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings):
+    # Тесты идут в одном процессе, поэтому кэш каталога на LocMem
+    # корректен и включается явно.
+    settings.CATALOGUE_CACHE = dict(settings.CATALOGUE_CACHE, ENABLED=True)
+    for cache in caches.all():
+        cache.clear()
+    token_cache.clear()
+    yield
@@ -0,0 +1,119 @@
+import sys
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+from django.db.utils import ConnectionHandler
+from django.test import override_settings
+
+from api import db_routers
+from api_yamdb.database import databases
+
+
+@pytest.fixture
+def replica_reads(monkeypatch):
+    """Модели, прочитанные «с реплики»; сами запросы идут в default."""
+    models = []
+
+    def choose_replica():
+        return 'default'
+
+    def db_for_read(self, model, **hints):
+        alias = original(self, model, **hints)
+        if alias is not None:
+            models.append(model.__name__)
+        return alias
+
+    original = db_routers.ReplicaRouter.db_for_read
+    monkeypatch.setattr(db_routers, 'choose_replica', choose_replica)
+    monkeypatch.setattr(db_routers.ReplicaRouter, 'db_for_read', db_for_read)
+    with override_settings(DATABASE_READ_ALIASES=('replica_1',)):
+        yield models
+
+
+def stub_errors():
+    """Иерархия исключений DB-API, как в psycopg2."""
+    errors = {'Error': type('Error', (Exception,), {})}
+    for name, parent in (
+            ('InterfaceError', 'Error'), ('DatabaseError', 'Error'),
+            ('DataError', 'DatabaseError'),
+            ('OperationalError', 'DatabaseError'),
+            ('IntegrityError', 'DatabaseError'),
+            ('InternalError', 'DatabaseError'),
+            ('ProgrammingError', 'DatabaseError'),
+            ('NotSupportedError', 'DatabaseError')):
+        errors[name] = type(name, (errors[parent],), {})
+    return errors
+
+
+class StubPool:
+    """
+    ThreadedConnectionPool без сервера: выдаёт заглушки соединений,
+    свободные использует повторно и, как настоящий пул, поднимает
+    ошибку, если занято больше maxconn.
+    """
+
+    def __init__(self, minconn, maxconn, **conn_params):
+        self.args = (minconn, maxconn, conn_params)
+        self.idle = []
+        self.taken = []
+        self.returned = []
+        self.in_use = 0
+
+    def getconn(self):
+        if self.in_use >= self.args[1]:
+            raise RuntimeError('connection pool exhausted')
+        self.in_use += 1
+        if self.idle:
+            connection = self.idle.pop()
+        else:
+            connection = MagicMock(
+                closed=0, isolation_level=1, autocommit=False)
+            connection.get_parameter_status.return_value = 'UTC'
+        self.taken.append(connection)
+        return connection
+
+    def putconn(self, connection, close=False):
+        self.returned.append((connection, close))
+        self.in_use -= 1
+        if not close:
+            self.idle.append(connection)
+
+    @staticmethod
+    def break_connection(connection):
+        """Сервер закрыл соединение: любой запрос по нему — ошибка."""
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = sys.modules[
+            'psycopg2'].OperationalError('server closed the connection')
+
+
+@pytest.fixture
+def stub_psycopg2(monkeypatch, django_db_blocker):
+    """
+    Бэкенд postgresql_pool поверх заглушки psycopg2: модули драйвера
+    подменяются на время теста, пул — StubPool. Возвращает фабрику
+    соединений (каждое — как у отдельного потока, пул общий).
+    """
+    psycopg2 = MagicMock(
+        __version__='2.8.6 (dt dec pq3 ext lo64)', **stub_errors())
+    psycopg2.pool = ModuleType('psycopg2.pool')
+    psycopg2.pool.ThreadedConnectionPool = StubPool
+    for name in ('extensions', 'extras', 'pool'):
+        monkeypatch.setitem(
+            sys.modules, f'psycopg2.{name}', getattr(psycopg2, name))
+    monkeypatch.setitem(sys.modules, 'psycopg2', psycopg2)
+    loaded = set(sys.modules)
+
+    def connect(**environ):
+        handler = ConnectionHandler(databases('/srv', {
+            'DB_ENGINE': 'postgresql', 'DB_NAME': 'yamdb',
+            'DB_POOL_SIZE': '2', **environ,
+        }))
+        handler.ensure_defaults('default')
+        return handler['default']
+
+    with django_db_blocker.unblock():
+        yield connect
+    # Модули бэкенда держат ссылки на заглушку: выгружаем их.
+    for name in set(sys.modules) - loaded:
+        del sys.modules[name]
@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+from reviews.ratings import inconsistent_ratings
+
+from .common import auth_client, create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_stored_on_title(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются '
+            '`rating_sum` и `rating_count` произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва обновляется `rating` произведения'
+        )
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating) == (18, 6), (
+            'Проверьте, что при изменении оценки обновляется рейтинг произведения'
+        )
+
+        for review in reviews:
+            admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что при удалении отзывов обнуляется агрегат рейтинга'
+        )
+        assert title.rating is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ordering_by_rating(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'так себе', 'score': 1}
+        )
+        response = admin_client.get('/api/v1/titles/?ordering=-rating')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [
+            titles[0]['id'], titles[1]['id']
+        ], (
+            'Проверьте, что `ordering=rating` сортирует по сохранённому рейтингу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_ratings_command(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('rebuild_ratings', '--check')
+
+        Review.objects.filter(title_id=titles[0]['id']).update(score=10)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(rating=1)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        Title.objects.filter(pk=titles[1]['id']).update(rating=3)
+        assert [title.pk for title in inconsistent_ratings(Title)] == [
+            titles[0]['id'], titles[1]['id']
+        ], (
+            'Проверьте, что `rebuild_ratings --check` сверяет и сохранённый '
+            '`rating` со средним по отзывам'
+        )
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (30, 3, 10), (
+            'Проверьте, что `rebuild_ratings` пересчитывает агрегат рейтинга'
+        )
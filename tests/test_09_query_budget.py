@@ -0,0 +1,117 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+# Максимальное число SQL-запросов на страницу. Бюджет не должен зависеть
+# от количества объектов на странице: при N+1 тест упадёт на большом наборе.
+QUERY_BUDGETS = {
+    '/api/v1/titles/': 3,
+    '/api/v1/titles/{title_id}/': 2,
+    '/api/v1/categories/': 2,
+    '/api/v1/genres/': 2,
+    '/api/v1/titles/{title_id}/reviews/': 3,
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/': 3,
+}
+
+
+def seed_catalogue(django_user_model, size):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake')
+        for i in range(size)
+    ]
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category{i}')
+        for i in range(size)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre{i}')
+        for i in range(size)
+    ]
+    titles = []
+    for i in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=categories[i])
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='текст', score=5)
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='комментарий')
+    return titles[0], reviews[0]
+
+
+class Test09QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('size', (2, 30))
+    @pytest.mark.parametrize('url', QUERY_BUDGETS)
+    def test_01_query_budget(self, client, django_user_model, url, size):
+        title, review = seed_catalogue(django_user_model, size)
+        path = url.format(title_id=title.id, review_id=review.id)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path)
+        assert response.status_code == 200
+        assert len(context.captured_queries) <= QUERY_BUDGETS[url], (
+            f'Проверьте, что GET запрос `{url}` укладывается в бюджет '
+            f'{QUERY_BUDGETS[url]} SQL-запросов, выполнено '
+            f'{len(context.captured_queries)} при {size} объектах:\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_nested_create_resolves_parent_once(
+            self, django_user_model, user_client):
+        title, review = seed_catalogue(django_user_model, 2)
+        for url, data, table in (
+            (f'/api/v1/titles/{title.id}/reviews/',
+             {'text': 'отзыв', 'score': 7}, 'reviews_title'),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+             {'text': 'комментарий'}, 'reviews_review'),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.post(url, data=data)
+            assert response.status_code == 201
+            lookups = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('SELECT')
+                and f'FROM "{table}"' in query['sql']
+            ]
+            assert len(lookups) == 1, (
+                f'Проверьте, что POST запрос `{url}` ищет родительский '
+                f'объект один раз, выполнено:\n' + '\n'.join(lookups)
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_comments_check_title_review_pair(
+            self, django_user_model, user_client):
+        title, review = seed_catalogue(django_user_model, 2)
+        other_title = Title.objects.exclude(pk=title.pk).first()
+        base = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+        comment = Comment.objects.filter(review=review).first()
+        for method, url, data in (
+            ('get', base, None),
+            ('get', f'{base}{comment.id}/', None),
+            ('post', base, {'text': 'комментарий'}),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(user_client, method)(url, data=data)
+            assert response.status_code == 404, (
+                f'Проверьте, что {method.upper()} запрос `{url}` для отзыва '
+                f'другого произведения возвращает статус 404'
+            )
+            lookups = [
+                query['sql'] for query in context.captured_queries
+                if 'FROM "reviews_review"' in query['sql']
+            ]
+            assert len(lookups) == 1 and '"title_id"' in lookups[0], (
+                'Проверьте, что отзыв ищется одним запросом сразу '
+                'по `title_id` и `review_id`'
+            )
+        assert Comment.objects.filter(review=review).count() == 2
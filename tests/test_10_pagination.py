@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+from .common import create_reviews
+
+
+def crawl(client, url):
+    seen = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме не возвращается `count`'
+        )
+        seen.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return seen
+
+
+class Test10KeysetPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_limit_offset_is_default(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert 'count' in response.json(), (
+            'Проверьте, что по умолчанию используется пагинация limit/offset'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        seen = crawl(
+            client,
+            f'/api/v1/titles/{title_id}/reviews/?pagination=cursor&limit=2'
+        )
+        expected = list(
+            Review.objects.filter(title_id=title_id)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы по убыванию (`pub_date`, `id`) без повторов'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'/api/v1/titles/{title_id}/reviews/?pagination=cursor')
+        assert not any(
+            'COUNT(' in query['sql'].upper()
+            for query in context.captured_queries
+        ), 'Проверьте, что курсорная пагинация не выполняет COUNT(*)'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_titles_cursor_ignores_ordering(self, client, admin_client, admin):
+        create_reviews(admin_client, admin)
+        seen = crawl(
+            client, '/api/v1/titles/?pagination=cursor&limit=1&ordering=rating')
+        assert seen == list(
+            Title.objects.order_by('id').values_list('id', flat=True)), (
+            'Проверьте, что курсорная пагинация произведений идёт по `id`'
+        )
@@ -0,0 +1,67 @@
+import csv
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as csvfile:
+        return sum(1 for _ in csv.DictReader(csvfile))
+
+
+class Test11ImportCSV:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_csv(self):
+        call_command('import_csv', '--batch-size', '7')
+        for filename, model in (
+            ('users.csv', User),
+            ('titles.csv', Title),
+            ('genre_title.csv', Title.genre.through),
+            ('review.csv', Review),
+            ('comments.csv', Comment),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что `import_csv` загружает все строки `{filename}`'
+            )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что `import_csv` сохраняет `pub_date` из файла'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_resume_after_crash(self, monkeypatch):
+        from reviews import csv_import
+
+        original = csv_import.row_values
+        calls = {'review': 0}
+
+        def crash_midway(model, *args):
+            if model is Review:
+                calls['review'] += 1
+                if calls['review'] == 35:
+                    raise RuntimeError('сбой посреди загрузки')
+            return original(model, *args)
+
+        monkeypatch.setattr(csv_import, 'row_values', crash_midway)
+        with pytest.raises(RuntimeError):
+            call_command('import_csv', '--batch-size', '10', '--workers', '3')
+        assert Review.objects.count() == 30, (
+            'Проверьте, что при сбое зафиксированы только завершённые пачки'
+        )
+
+        monkeypatch.setattr(csv_import, 'row_values', original)
+        call_command('import_csv', '--batch-size', '10', '--resume')
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что `import_csv --resume` догружает файл '
+            'с контрольной точки без повторов'
+        )
+        assert Comment.objects.count() == count_rows('comments.csv')
+        call_command('rebuild_ratings', '--check')
@@ -0,0 +1,57 @@
+import pytest
+
+from reviews.search import tsquery
+from .common import create_titles
+
+
+def found_ids(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, (
+        f'Проверьте, что GET запрос `/api/v1/titles/?{query}` возвращает статус 200'
+    )
+    return {title['id'] for title in response.json()['results']}
+
+
+class Test12TitleFilters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_exact_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        assert found_ids(client, 'year=200') == set(), (
+            'Проверьте, что фильтр `year` сравнивает год точно'
+        )
+        assert found_ids(client, 'year=2000') == {titles[0]['id']}
+        assert found_ids(client, 'genre=horr') == set(), (
+            'Проверьте, что фильтр `genre` сравнивает slug точно'
+        )
+        assert found_ids(client, f'genre={genres[0]["slug"]}') == {
+            titles[0]['id']}
+        assert found_ids(client, f'category={categories[1]["slug"]}') == {
+            titles[1]['id']}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert found_ids(client, 'search=поворот') == {titles[0]['id']}, (
+            'Проверьте, что `search` ищет по названию без учёта регистра'
+        )
+        assert found_ids(client, 'search=драм') == {titles[1]['id']}, (
+            'Проверьте, что `search` ищет по описанию и по началу слова'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Поворот обратно'})
+        assert found_ids(client, 'search=Поворот') == {
+            titles[0]['id'], titles[1]['id']}, (
+            'Проверьте, что поисковый индекс обновляется при изменении названия'
+        )
+        assert found_ids(client, 'search="AND(*') == set(), (
+            'Проверьте, что спецсимволы в `search` не ломают запрос'
+        )
+
+    def test_03_postgres_tsquery(self):
+        assert tsquery("Пово'рот  драм:*") == (
+            "'Пово':* & 'рот':* & 'драм':*"), (
+            'Проверьте, что запрос PostgreSQL ищет слова по префиксу, '
+            'а операторы tsquery из ввода отбрасываются'
+        )
+        assert tsquery('!&|()') == ''
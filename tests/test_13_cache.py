@@ -0,0 +1,153 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.cache import get_versions
+from .common import create_titles
+
+
+class Test13ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_hit(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?year=2000&genre=horror')
+        assert response['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?genre=horror&year=2000')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что ключ кэша не зависит от порядка параметров запроса'
+        )
+        assert not context.captured_queries, (
+            'Проверьте, что ответ из кэша отдаётся без запросов к базе'
+        )
+        assert response.json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        client.get('/api/v1/categories/')
+        client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+
+        admin_client.post(f'{url}reviews/', data={'text': 'ok', 'score': 8})
+        response = client.get(url)
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+        )
+        assert client.get(f'/api/v1/titles/{titles[1]["id"]}/')['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв не сбрасывает кэш других произведений'
+        )
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'HIT'
+
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert client.get('/api/v1/categories/').json()['count'] == 1, (
+            'Проверьте, что удаление категории сбрасывает кэш категорий'
+        )
+        assert client.get(url).json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stats(self, client, user_client, admin_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        assert user_client.get('/api/v1/cache/stats/').status_code == 403
+        response = admin_client.get('/api/v1/cache/stats/')
+        assert response.status_code == 200
+        assert response.json() == {'hits': 1, 'misses': 1}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_conditional_get(self, client, admin_client, admin):
+        from .common import create_reviews
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag, 'Проверьте, что список отзывов возвращает заголовок `ETag`'
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается статус 304'
+        )
+        assert not context.captured_queries, (
+            'Проверьте, что ответ 304 отдаётся без запросов к базе'
+        )
+
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+        assert response['ETag'] != etag
+
+        comments_url = f'{url}{reviews[0]["id"]}/comments/'
+        etag = client.get(comments_url)['ETag']
+        admin_client.post(comments_url, data={'text': 'комментарий'})
+        assert client.get(comments_url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что новый комментарий меняет `ETag` списка комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_users_namespace(self, client, admin):
+        def users_version():
+            return get_versions(['users'])[0]
+
+        version = users_version()
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+        admin.bio = 'новое'
+        admin.save()
+        admin.last_login = timezone.now()
+        admin.save(update_fields=['last_login'])
+        assert users_version() == version, (
+            'Проверьте, что регистрация и изменение профиля '
+            'не сбрасывают кэш отзывов и комментариев'
+        )
+        admin.username = 'RenamedAdmin'
+        admin.save()
+        assert users_version() != version, (
+            'Проверьте, что смена username сбрасывает кэш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_conditional_get_without_cache(
+            self, client, admin_client, admin, settings):
+        from .common import create_reviews
+        settings.CATALOGUE_CACHE = dict(
+            settings.CATALOGUE_CACHE, ENABLED=False)
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and 'X-Cache' not in response, (
+            'Проверьте, что ETag выдаётся и с выключенным кэшем ответов'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что 304 возвращается и с выключенным кэшем ответов'
+        )
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что для 304 читаются только версии из базы'
+        )
+        admin_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+        settings.CATALOGUE_CACHE = dict(
+            settings.CATALOGUE_CACHE, ENABLED=True)
+        admin_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'ещё текст'})
+        settings.CATALOGUE_CACHE = dict(
+            settings.CATALOGUE_CACHE, ENABLED=False)
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что версии в базе меняются и при включённом кэше'
+        )
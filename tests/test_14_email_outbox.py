@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews import outbox
+from reviews.models import OutgoingEmail
+
+
+class Test14EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        for i in range(3):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'})
+            assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом не отправляется во время запроса'
+        )
+        assert outbox.stats()['pending'] == 3
+
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == outbox_before_count + 3, (
+            'Проверьте, что воркер `send_emails` отправляет письма из очереди'
+        )
+        assert outbox.stats()['pending'] == 0
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, monkeypatch, settings):
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'MAX_ATTEMPTS': 2}
+        email = outbox.enqueue('Тема', 'Текст', 'user@yamdb.fake')
+
+        def broken_send(self, fail_silently=False):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr('django.core.mail.EmailMessage.send', broken_send)
+        assert outbox.drain(10) == 0
+        email.refresh_from_db()
+        assert email.attempts == 1 and not email.failed
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что после неудачи следующая попытка откладывается'
+        )
+        assert outbox.drain(10) == 0, (
+            'Проверьте, что письмо не отправляется повторно до истечения паузы'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        outbox.drain(10)
+        email.refresh_from_db()
+        assert email.failed and 'SMTP' in email.last_error, (
+            'Проверьте, что после MAX_ATTEMPTS попыток доставка прекращается'
+        )
+        assert outbox.stats()['failed'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_concurrent_claim(self, settings):
+        for i in range(3):
+            outbox.enqueue('Тема', 'Текст', f'user{i}@yamdb.fake')
+        # Второй воркер прочитал письма до того, как их взял первый.
+        stale = list(outbox.pending())
+        assert len(outbox.claim(10)) == 3
+        assert not any(
+            outbox.take(email, timezone.now()) for email in stale), (
+            'Проверьте, что письмо, взятое одним воркером, '
+            'не достаётся другому'
+        )
+        assert outbox.claim(10) == []
+
+        OutgoingEmail.objects.update(
+            claimed_at=timezone.now() - timedelta(
+                seconds=settings.EMAIL_OUTBOX['LEASE'] + 1))
+        assert len(outbox.claim(10)) == 3, (
+            'Проверьте, что письма упавшего воркера возвращаются в очередь '
+            'по истечении аренды'
+        )
@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import (
+    get_cache, get_version, token_for_user, token_user,
+)
+
+from .common import create_titles
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {token_for_user(user)}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+class Test15TokenClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_user_queries(self, admin_client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        client = claims_client(moderator)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data={'text': 'ok', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['author'] == moderator.username
+        assert not user_queries(context), (
+            'Проверьте, что токен с ролью авторизует запрос '
+            'без обращения к таблице пользователей'
+        )
+        review_url = f'{url}{response.json()["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.patch(review_url, data={'text': 'новый'})
+        assert response.status_code == 200
+        assert not user_queries(context), (
+            'Проверьте, что права автора проверяются по id без загрузки '
+            'пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_token(self, admin_client, admin, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        user.refresh_from_db()
+        response = claims_client(user).get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что новый токен несёт новую роль'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_blocked_user(self, user):
+        client = claims_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_partial_save_revokes_token(self, user, django_user_model):
+        client = claims_client(user)
+        user.role = 'moderator'
+        user.save(update_fields=['role'])
+        stored = django_user_model.objects.get(pk=user.pk)
+        assert stored.token_version == get_version(user.pk) == 1, (
+            'Проверьте, что при save(update_fields=...) новая версия '
+            'токенов записывается в базу'
+        )
+        get_cache().clear()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен остаётся отозванным и после '
+            'истечения кэша версий'
+        )
+        stale = django_user_model.objects.get(pk=user.pk)
+        stale.token_version = 0
+        stale.bio = 'о себе'
+        stale.save(update_fields=['bio', 'username'])
+        assert django_user_model.objects.get(
+            pk=user.pk).token_version == 1, (
+            'Проверьте, что устаревший объект не откатывает версию токенов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_token_user_not_saved(self, user, django_user_model):
+        user.bio = 'о себе'
+        user.save()
+        token = token_user(user.pk, {'username': user.username})
+        with pytest.raises(TypeError):
+            token.save()
+        with pytest.raises(TypeError):
+            token.delete()
+        response = claims_client(user).patch(
+            '/api/v1/users/me/', data={'first_name': 'Имя'})
+        assert response.status_code == 200
+        stored = django_user_model.objects.get(pk=user.pk)
+        assert (stored.first_name, stored.bio, stored.email) == (
+            'Имя', 'о себе', user.email), (
+            'Проверьте, что запись профиля не затирает поля, '
+            'которых нет в токене'
+        )
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import TokenCache, token_cache, token_for_user
+
+
+def bearer_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+class Test16TokenCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_repeated_token_skips_verification(self, user, monkeypatch):
+        client = bearer_client(AccessToken.for_user(user))
+        assert client.get('/api/v1/users/me/').status_code == 200
+        assert len(token_cache) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError('подпись проверяется повторно')
+
+        monkeypatch.setattr(
+            'api.authentication.CachedJWTAuthentication.get_validated_token',
+            fail)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_user' in query['sql']
+        ], 'Проверьте, что повторный токен не загружает пользователя'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cached_token_revoked(self, user):
+        legacy, versioned = (
+            bearer_client(token)
+            for token in (AccessToken.for_user(user), token_for_user(user))
+        )
+        for client in (legacy, versioned):
+            assert client.get('/api/v1/users/me/').status_code == 200
+        user.role = 'moderator'
+        user.save()
+        assert versioned.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен из LRU отзывается сменой роли'
+        )
+        response = legacy.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что токен без версии после смены роли '
+            'проверяется по базе, а не отклоняется'
+        )
+        assert response.json()['role'] == 'moderator'
+        user.is_active = False
+        user.save()
+        assert legacy.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен без версии заблокированного '
+            'пользователя отклоняется'
+        )
+
+    def test_03_bounded_lru(self, monkeypatch):
+        cache = TokenCache(max_size=2, ttl=60)
+        now = 1000.0
+        monkeypatch.setattr('api.authentication.time.time', lambda: now)
+        cache.set('a', now + 3600, 1)
+        cache.set('b', now + 3600, 2)
+        assert cache.get('a') is not None
+        cache.set('c', now + 3600, 3)
+        assert cache.get('b') is None, 'Вытесняется давно не использованный'
+        assert len(cache) == 2
+        now += 61
+        assert cache.get('a') is None, 'Запись живёт не дольше ttl'
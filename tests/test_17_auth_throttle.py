@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import AuthUsernameThrottle
+
+
+class Test17AuthThrottle:
+    url_token = '/api/v1/auth/token/'
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_username_brute_force(self, client, user, monkeypatch):
+        monkeypatch.setattr(AuthUsernameThrottle, 'rate', '3/min', raising=False)
+        data = {'username': user.username, 'confirmation_code': '111111'}
+        for _ in range(3):
+            assert client.post(self.url_token, data=data).status_code == 400
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_token, data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что перебор кода для одного username ограничен'
+        )
+        assert response['Retry-After']
+        assert not context.captured_queries, (
+            'Проверьте, что отклонённый запрос не обращается к базе'
+        )
+        other = {'username': 'other', 'confirmation_code': '111111'}
+        assert client.post(self.url_token, data=other).status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ip_limit(self, client, monkeypatch):
+        monkeypatch.setattr(
+            'api.throttling.AuthIPThrottle.rate', '2/min', raising=False)
+        for i in range(2):
+            response = client.post(self.url_signup, data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'})
+            assert response.status_code == 200
+        response = client.post(self.url_signup, data={
+            'username': 'user3', 'email': 'user3@yamdb.fake'},
+            HTTP_X_FORWARDED_FOR='10.0.0.3')
+        assert response.status_code == 429, (
+            'Проверьте, что регистрации с одного IP ограничены '
+            'и подменой X-Forwarded-For лимит не обойти'
+        )
+
+    def test_03_sliding_window(self, monkeypatch):
+        now = 120.0
+        monkeypatch.setattr(AuthUsernameThrottle, 'rate', '4/min', raising=False)
+        monkeypatch.setattr(AuthUsernameThrottle, 'timer', lambda self: now)
+
+        class Request:
+            data = {'username': 'TestUser'}
+
+        def allowed():
+            return AuthUsernameThrottle().allow_request(Request(), None)
+
+        assert all(allowed() for _ in range(4))
+        assert not allowed()
+        now = 180.0 + 30
+        assert allowed(), 'Половина прошлого окна уже не учитывается'
+        assert not allowed()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_list_body(self, client):
+        response = client.post(
+            self.url_token, data=[{'username': 'x'}],
+            content_type='application/json')
+        assert response.status_code == 400, (
+            'Проверьте, что тело-список не приводит к ошибке 500'
+        )
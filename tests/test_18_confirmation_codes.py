@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews import confirmation
+from reviews.admin import OutgoingEmailAdmin
+from reviews.models import ConfirmationCode, OutgoingEmail
+
+
+class Test18ConfirmationCodes:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    data = {'username': 'codeuser', 'email': 'codeuser@yamdb.fake'}
+
+    def signup(self, client):
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        call_command('send_emails', '--once')
+        return mail.outbox[-1].body.split()[-1]
+
+    def token(self, client, code):
+        return client.post(self.url_token, data={
+            'username': self.data['username'], 'confirmation_code': code})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_hashed_single_use(self, client):
+        code = self.signup(client)
+        stored = ConfirmationCode.objects.get()
+        assert code not in stored.code_hash, (
+            'Проверьте, что код хранится только в виде хэша'
+        )
+        assert self.token(client, code).status_code == 200
+        assert self.token(client, code).status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_replaces_code(self, client, monkeypatch):
+        codes = iter(('111111', '222222'))
+        monkeypatch.setattr(
+            confirmation, 'get_random_string', lambda *args: next(codes))
+        old_code = self.signup(client)
+        with CaptureQueriesContext(connection) as context:
+            new_code = self.signup(client)
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_user"')
+        ], 'Проверьте, что повторная регистрация не перезаписывает пользователя'
+        assert ConfirmationCode.objects.count() == 1
+        assert (old_code, new_code) == ('111111', '222222')
+        assert self.token(client, old_code).status_code == 400, (
+            'Проверьте, что новый код отменяет прежний'
+        )
+        assert self.token(client, new_code).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_expiry_and_purge(self, client):
+        code = self.signup(client)
+        ConfirmationCode.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1))
+        assert self.token(client, code).status_code == 400, (
+            'Проверьте, что просроченный код не принимается'
+        )
+        call_command('purge_confirmation_codes')
+        assert not ConfirmationCode.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_outbox_redacted(self, client):
+        code = self.signup(client)
+        assert code not in OutgoingEmail.objects.get().message, (
+            'Проверьте, что текст письма с кодом стирается после отправки'
+        )
+        assert 'message' in OutgoingEmailAdmin.exclude
+        OutgoingEmail.objects.create(
+            subject='s', message=f'код {code}', recipient='a@yamdb.fake',
+            sent_at=timezone.now())
+        call_command('purge_confirmation_codes')
+        assert not OutgoingEmail.objects.filter(
+            message__contains=code).exists(), (
+            'Проверьте, что purge_confirmation_codes стирает текст '
+            'отправленных писем'
+        )
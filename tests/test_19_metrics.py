@@ -0,0 +1,73 @@
+import json
+import logging
+
+import pytest
+from django.test import override_settings
+from rest_framework.serializers import ListSerializer, Serializer
+from rest_framework.test import APIClient
+
+from api.metrics import registry
+from .common import create_titles
+
+METRICS_ON = {'ENABLED': True, 'BUCKETS': (0.1, 1)}
+
+
+def metric(text, name, **labels):
+    prefix = name + '{' + ','.join(
+        f'{key}="{value}"' for key, value in labels.items()) + '}'
+    for line in text.splitlines():
+        if line.startswith(prefix + ' '):
+            return float(line.split()[-1])
+    return None
+
+
+class Test19Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prometheus_endpoint(self, admin_client, token_admin, caplog):
+        create_titles(admin_client)
+        registry.clear()
+        logger = logging.getLogger('api.metrics')
+        logger.addHandler(caplog.handler)
+        try:
+            with override_settings(METRICS=METRICS_ON):
+                client = APIClient()
+                client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}')
+                client.get('/api/v1/titles/')
+                client.get('/api/v1/titles/')
+                response = client.get('/api/v1/metrics/')
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        labels = {'route': 'titles-list', 'action': 'list'}
+        assert metric(text, 'yamdb_requests_total', **labels) == 2
+        assert metric(text, 'yamdb_sql_queries_total', **labels) >= 1, (
+            'Проверьте, что считаются SQL-запросы запроса'
+        )
+        assert metric(text, 'yamdb_serializer_seconds_total', **labels) > 0
+        for serializer_class in (Serializer, ListSerializer):
+            assert serializer_class.data.fget.__module__ == (
+                'rest_framework.serializers'), (
+                'Проверьте, что замер сериализации не подменяет '
+                'свойства DRF'
+            )
+        assert metric(text, 'yamdb_response_bytes_total', **labels) > 0
+        assert metric(
+            text, 'yamdb_request_duration_seconds_count', **labels) == 2
+
+        record = json.loads(caplog.records[0].getMessage())
+        assert record['route'] == 'titles-list'
+        assert record['sql_queries'] >= 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_admin_only_and_disabled(self, user_client, admin_client):
+        registry.clear()
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+        admin_client.get('/api/v1/genres/')
+        response = admin_client.get('/api/v1/metrics/')
+        assert 'route="genres-list"' not in response.content.decode(), (
+            'Проверьте, что без METRICS_ENABLED запросы не учитываются'
+        )
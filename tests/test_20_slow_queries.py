@@ -0,0 +1,96 @@
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api import slow_queries
+from api.slow_queries import fingerprint, redact_plan
+from reviews.models import SlowQuery
+from .common import create_titles
+
+SLOW_QUERIES = {
+    'ENABLED': True,
+    'THRESHOLD_MS': 0,
+    'SAMPLE_RATE': 1,
+    'SIZE': 3,
+    'ROUTES': ('titles-list', 'users-list'),
+    'BACKGROUND': False,
+}
+
+
+class Test20SlowQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_journal(self, admin_client, token_admin, monkeypatch):
+        create_titles(admin_client)
+
+        def explain_with_values(sql, params, using):
+            # EXPLAIN на PostgreSQL подставляет значения в условия.
+            values = ' AND '.join(
+                f"(f = '{value}'::text)" if isinstance(value, str)
+                else f'(f = {value})' for value in params or ())
+            return f'{original(sql, params, using)}\nFilter: {values}'
+
+        original = slow_queries.explain
+        monkeypatch.setattr(slow_queries, 'explain', explain_with_values)
+        with override_settings(SLOW_QUERIES=SLOW_QUERIES):
+            # Middleware подключается при первом запросе клиента.
+            admin_client = APIClient()
+            admin_client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}')
+            admin_client.get('/api/v1/genres/')
+            assert not SlowQuery.objects.exists(), (
+                'Проверьте, что журнал ведётся только для выбранных эндпоинтов'
+            )
+            admin_client.get('/api/v1/titles/?limit=1')
+            admin_client.get('/api/v1/titles/?limit=2')
+            admin_client.get('/api/v1/users/?search=Test')
+        journal = SlowQuery.objects.all()
+        assert 0 < journal.count() <= SLOW_QUERIES['SIZE'], (
+            'Проверьте, что в журнале остаются только худшие SIZE отпечатков'
+        )
+        assert any(entry.calls > 1 for entry in journal), (
+            'Проверьте, что одинаковые запросы с разными значениями '
+            'группируются по отпечатку'
+        )
+        assert all(
+            entry.plan for entry in journal if entry.sql.startswith('SELECT')
+        ), 'Проверьте, что для SELECT сохраняется план EXPLAIN'
+        assert not journal.filter(sql__icontains='Test').exists(), (
+            'Проверьте, что в журнал попадает запрос без значений параметров'
+        )
+        assert not journal.filter(plan__icontains='Test').exists(), (
+            'Проверьте, что значения параметров вырезаются и из плана'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_admin(self, user_superuser, client):
+        SlowQuery.objects.create(
+            fingerprint='0' * 32, route='titles-list', sql='SELECT 1',
+            calls=2, total_ms=30, max_ms=20)
+        client.force_login(user_superuser)
+        response = client.get('/admin/reviews/slowquery/')
+        assert response.status_code == 200
+        assert 'titles-list' in response.content.decode()
+
+    def test_03_fingerprint(self):
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s) LIMIT 20'
+        ) == fingerprint('SELECT * FROM t WHERE id IN (%s) LIMIT 5') == (
+            fingerprint("SELECT * FROM t  WHERE id IN (%s, %s, %s) LIMIT 1")
+        )
+
+    def test_04_redact_plan(self):
+        plan = (
+            "Index Scan using reviews_user_pkey on reviews_user "
+            "(cost=0.29..8.30 rows=1 width=8)\n"
+            "  Index Cond: (id = 42)\n"
+            "  Filter: ((email)::text = 'a@yamdb.fake'::text "
+            "AND score >= 7 AND id = ANY ('{1,2}'::integer[]))"
+        )
+        assert redact_plan(plan) == (
+            "Index Scan using reviews_user_pkey on reviews_user "
+            "(cost=0.29..8.30 rows=1 width=8)\n"
+            "  Index Cond: (id = ?)\n"
+            "  Filter: ((email)::text = '?'::text "
+            "AND score >= ? AND id = ANY ('?'::integer[]))"
+        ), 'Проверьте, что из плана вырезаются значения, но не оценки'
@@ -0,0 +1,126 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import ReviewsViewSet
+from reviews.models import Comment, Review, Title
+from .common import create_titles
+
+
+def create_authors(django_user_model, count):
+    return [
+        django_user_model.objects.create_user(
+            username=f'bulk{i}', email=f'bulk{i}@yamdb.fake')
+        for i in range(count)
+    ]
+
+
+class Test21BulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_bulk(self, admin_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        authors = create_authors(django_user_model, 50)
+        admin_client.get(url)
+        items = [
+            {'author': author.username, 'text': 'отзыв', 'score': i % 10 + 1}
+            for i, author in enumerate(authors)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'{url}bulk/', data=items, format='json')
+        assert response.status_code == 201, response.json()
+        assert len(response.json()) == 50
+        assert response.json()[0]['author'] == 'bulk0'
+        assert len(context.captured_queries) < 15, (
+            'Проверьте, что число запросов не зависит от размера пачки'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.rating_count == 50
+        assert title.rating == pytest.approx(
+            sum(item['score'] for item in items) / 50), (
+            'Проверьте, что bulk обновляет рейтинг произведения'
+        )
+        assert admin_client.get(url).json()['count'] == 50, (
+            'Проверьте, что bulk сбрасывает кэш списка отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_bulk_errors(self, admin_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        first, second = create_authors(django_user_model, 2)
+        Review.objects.create(
+            title_id=titles[0]['id'], author=first, text='был', score=5)
+        response = admin_client.post(url, data=[
+            {'author': first.username, 'text': 'дубль', 'score': 5},
+            {'author': second.username, 'text': 'ок', 'score': 5},
+            {'author': second.username, 'text': 'дубль в пачке', 'score': 5},
+            {'author': 'nobody', 'text': 'ок', 'score': 5},
+            {'author': second.username, 'text': 'ок', 'score': 11},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert [bool(error) for error in errors] == [
+            True, False, True, True, True], (
+            'Проверьте, что ошибки возвращаются по каждому элементу'
+        )
+        assert 'author' in errors[0] and 'score' in errors[4]
+        assert Review.objects.count() == 1, (
+            'Проверьте, что при ошибках пачка не создаётся'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_comments_bulk(self, admin_client, user_client, admin,
+                              django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='отзыв', score=5)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{review.id}/comments/bulk/')
+        authors = create_authors(django_user_model, 3)
+        items = [{'author': author.username, 'text': 'комментарий'}
+                 for author in authors] * 2
+        assert user_client.post(
+            url, data=items, format='json').status_code == 403
+        # Комментарий между запросами сдвигает последовательность id.
+        Comment.objects.create(review=review, author=admin, text='свой')
+        response = admin_client.post(url, data=items, format='json')
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=review).count() == 7
+        created = {
+            comment['id']: comment['author'] for comment in response.json()}
+        assert dict(Comment.objects.filter(pk__in=created).values_list(
+            'id', 'author__username')) == created, (
+            'Проверьте, что в ответе id созданных комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_concurrent_review(self, admin_client, django_user_model,
+                                  monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        first, second = create_authors(django_user_model, 2)
+        check = ReviewsViewSet.bulk_author_errors
+        calls = []
+
+        def racing_check(self, parent, author_ids):
+            # Параллельный POST успевает между проверкой и вставкой.
+            if not calls:
+                Review.objects.create(
+                    title=parent, author=first, text='гонка', score=5)
+            calls.append(author_ids)
+            return {} if len(calls) == 1 else check(self, parent, author_ids)
+
+        monkeypatch.setattr(
+            ReviewsViewSet, 'bulk_author_errors', racing_check)
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/', data=[
+                {'author': second.username, 'text': 'ок', 'score': 5},
+                {'author': first.username, 'text': 'дубль', 'score': 5},
+            ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что конфликт с параллельной записью даёт 400, а не 500'
+        )
+        assert [bool(error) for error in response.json()] == [False, True]
+        assert Review.objects.count() == 1
@@ -0,0 +1,177 @@
+import time
+from threading import Thread
+
+import pytest
+from django.core.signals import request_finished
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+from api import db_routers
+from api_yamdb.database import (
+    POOL_ENGINE, close_unusable_connections, databases, replicas,
+)
+from .common import create_titles
+
+
+class Test22Database:
+
+    def test_01_sqlite_by_default(self):
+        config = databases('/srv', {'CONN_MAX_AGE': '30'})
+        assert list(config) == ['default']
+        assert config['default']['NAME'] == '/srv/db.sqlite3'
+        assert config['default']['CONN_MAX_AGE'] == 30
+        assert replicas(config) == ()
+
+    def test_02_postgres_profile(self):
+        config = databases('/srv', {
+            'DB_ENGINE': 'postgresql',
+            'DB_HOST': 'primary',
+            'DB_REPLICA_HOSTS': 'r1, r2',
+            'DB_POOL_SIZE': '20',
+        })
+        assert replicas(config) == ('replica_1', 'replica_2')
+        assert config['replica_2']['HOST'] == 'r2'
+        assert config['replica_1']['TEST'] == {'MIRROR': 'default'}, (
+            'Проверьте, что в тестах реплики читают тестовую базу default'
+        )
+        assert config['default']['ENGINE'] == POOL_ENGINE
+        assert config['default']['POOL']['MAX_SIZE'] == 20
+        assert config['default']['CONN_MAX_AGE'] == 0, (
+            'Проверьте, что с пулом соединение не удерживается потоком'
+        )
+        config = databases('/srv', {'DB_ENGINE': 'postgresql'})
+        assert config['default']['ENGINE'] == 'django.db.backends.postgresql'
+        assert config['default']['CONN_MAX_AGE'] == 60
+        assert config['default']['HEALTH_CHECKS'] is True
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_replica_reads(self, admin_client, replica_reads):
+        titles, _, _ = create_titles(admin_client)
+        # После записи клиент какое-то время читает из основной базы.
+        admin_client.cookies.clear()
+        replica_reads.clear()
+        admin_client.get('/api/v1/titles/')
+        assert 'Title' in replica_reads, (
+            'Проверьте, что список произведений читается с реплики'
+        )
+        assert 'User' not in replica_reads, (
+            'Проверьте, что аутентификация читает из основной базы'
+        )
+        replica_reads.clear()
+        admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'отзыв', 'score': 5})
+        admin_client.get('/api/v1/users/me/')
+        assert replica_reads == [], (
+            'Проверьте, что записи и users/me/ идут в основную базу'
+        )
+
+    def test_04_router_writes_to_primary(self):
+        router = db_routers.ReplicaRouter()
+        with override_settings(DATABASE_REPLICAS=('replica_1',)):
+            assert router.db_for_write(None) == 'default'
+            assert router.allow_migrate('replica_1', 'reviews') is False
+            assert router.allow_migrate('default', 'reviews') is None
+
+    def test_05_health_checks(self, monkeypatch):
+        class Connection:
+            connection = object()
+            settings_dict = {'HEALTH_CHECKS': False}
+            closed = False
+
+            def is_usable(self):
+                return False
+
+            def close(self):
+                self.closed = True
+
+        broken = Connection()
+        monkeypatch.setattr(connections, 'all', lambda: [broken])
+        close_unusable_connections()
+        assert not broken.closed
+        broken.settings_dict = {'HEALTH_CHECKS': True}
+        close_unusable_connections()
+        assert broken.closed, (
+            'Проверьте, что разорванное соединение закрывается до запроса'
+        )
+
+    def test_06_pool_checkout(self, stub_psycopg2):
+        connection = stub_psycopg2()
+        connection.ensure_connection()
+        pool = connection.get_pool({})
+        assert pool.args[:2] == (1, 2)
+        assert pool.args[2]['database'] == 'yamdb'
+        assert pool.taken == [connection.connection], (
+            'Проверьте, что соединение берётся из пула'
+        )
+        other = stub_psycopg2()
+        other.ensure_connection()
+        assert other.get_pool({}) is pool, (
+            'Проверьте, что потоки одного процесса делят один пул'
+        )
+        assert len(pool.taken) == 2
+
+    def test_07_pool_return_on_request_finished(
+            self, stub_psycopg2, monkeypatch):
+        connection = stub_psycopg2()
+        connection.ensure_connection()
+        raw = connection.connection
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+        request_finished.send(sender=self.__class__)
+        assert connection.connection is None
+        assert connection.get_pool({}).returned == [(raw, False)], (
+            'Проверьте, что в конце запроса соединение возвращается в пул'
+        )
+
+    def test_08_pool_drops_unusable_connection(self, stub_psycopg2):
+        connection = stub_psycopg2()
+        connection.ensure_connection()
+        raw = connection.connection
+        raw.closed = 2
+        connection.close()
+        assert connection.get_pool({}).returned == [(raw, True)], (
+            'Проверьте, что разорванное соединение закрывается, '
+            'а не возвращается в пул'
+        )
+
+    def test_09_pool_waits_for_free_connection(self, stub_psycopg2):
+        busy = [stub_psycopg2(), stub_psycopg2()]
+        for connection in busy:
+            connection.ensure_connection()
+        with pytest.raises(OperationalError):
+            stub_psycopg2(DB_POOL_TIMEOUT='0.05').ensure_connection()
+
+        waiting = {}
+
+        def checkout():
+            connection = stub_psycopg2(DB_POOL_TIMEOUT='5')
+            connection.ensure_connection()
+            waiting['connection'] = connection.connection
+
+        thread = Thread(target=checkout)
+        thread.start()
+        time.sleep(0.05)
+        assert 'connection' not in waiting
+        raw = busy[0].connection
+        busy[0].close()
+        thread.join(5)
+        assert waiting.get('connection') is raw, (
+            'Проверьте, что при занятом пуле поток ждёт освободившееся '
+            'соединение, а не получает ошибку'
+        )
+
+    def test_10_pool_replaces_dead_connection(self, stub_psycopg2):
+        first = stub_psycopg2()
+        first.ensure_connection()
+        dead = first.connection
+        first.close()
+        pool = first.get_pool({})
+        pool.break_connection(dead)
+        connection = stub_psycopg2()
+        connection.ensure_connection()
+        assert connection.connection is not dead, (
+            'Проверьте, что разорванное соединение из пула не выдаётся'
+        )
+        assert (dead, True) in pool.returned, (
+            'Проверьте, что разорванное соединение закрывается'
+        )
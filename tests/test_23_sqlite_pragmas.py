@@ -0,0 +1,35 @@
+import pytest
+from django.db.utils import ConnectionHandler
+
+from api_yamdb.database import SQLITE_PRAGMAS, databases
+
+
+class Test23SqlitePragmas:
+
+    def test_01_profile(self):
+        config = databases('/srv', {})['default']
+        assert config['PRAGMAS'] == SQLITE_PRAGMAS
+        config = databases('/srv', {'SQLITE_MMAP_SIZE': '0'})['default']
+        assert config['PRAGMAS']['mmap_size'] == '0', (
+            'Проверьте, что PRAGMA переопределяются переменными окружения'
+        )
+        config = databases('/srv', {'SQLITE_TUNING': '0'})['default']
+        assert config['PRAGMAS'] == {}
+
+    @pytest.mark.django_db
+    def test_02_applied_on_connect(self, tmp_path):
+        config = databases(str(tmp_path), {})
+        connection = ConnectionHandler(config)['default']
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                assert cursor.fetchone()[0] == 'wal', (
+                    'Проверьте, что новое соединение с SQLite '
+                    'переводится в режим WAL'
+                )
+                cursor.execute('PRAGMA synchronous')
+                assert cursor.fetchone()[0] == 1  # NORMAL
+                cursor.execute('PRAGMA busy_timeout')
+                assert cursor.fetchone()[0] == SQLITE_PRAGMAS['busy_timeout']
+        finally:
+            connection.close()
@@ -0,0 +1,103 @@
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from api_yamdb.database import databases, read_aliases
+from .common import create_reviews, create_titles
+
+
+class Test24ReadRouting:
+
+    def test_01_read_aliases(self):
+        config = databases('/srv', {
+            'DB_ENGINE': 'postgresql', 'DB_REPLICA_HOSTS': 'r1,r2'})
+        assert read_aliases(config, {}) == ('replica_1', 'replica_2')
+        assert read_aliases(config, {'DB_READ_ALIASES': 'replica_2'}) == (
+            'replica_2',)
+        with pytest.raises(ImproperlyConfigured):
+            read_aliases(config, {'DB_READ_ALIASES': 'analytics'})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_actions(self, admin_client, admin, replica_reads):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        admin_client.cookies.clear()
+        replica_reads.clear()
+        admin_client.get(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/')
+        assert 'Review' in replica_reads, (
+            'Проверьте, что отдельный отзыв читается с реплики'
+        )
+        replica_reads.clear()
+        admin_client.post('/api/v1/auth/signup/', data={
+            'username': 'replica', 'email': 'replica@yamdb.fake'})
+        admin_client.get('/api/v1/users/me/')
+        assert replica_reads == [], (
+            'Проверьте, что auth/ и users/me/ читают из основной базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_read_your_writes(self, user_client, admin_client,
+                                 replica_reads):
+        titles, _, _ = create_titles(admin_client)
+        cookie = settings.DATABASE_STICKY['COOKIE']
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert response.cookies[cookie]['max-age'] == (
+            settings.DATABASE_STICKY['SECONDS']), (
+            'Проверьте, что после записи клиент получает cookie '
+            'на DATABASE_STICKY["SECONDS"] секунд'
+        )
+        replica_reads.clear()
+        user_client.get(url)
+        assert replica_reads == [], (
+            'Проверьте, что после записи автор читает из основной базы'
+        )
+        del user_client.cookies[cookie]
+        # Другой URL: ответ на первый GET уже в кэше.
+        user_client.get(url, {'limit': 1})
+        assert 'Review' in replica_reads
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_no_cookie_without_replicas(self, user_client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'отзыв', 'score': 5})
+        assert settings.DATABASE_STICKY['COOKIE'] not in response.cookies
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_replica_reads_not_cached(self, client, admin_client,
+                                         replica_reads):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for _ in range(2):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response['X-Cache'] == 'MISS', (
+                'Проверьте, что ответ, прочитанный с реплики, не кэшируется'
+            )
+            assert 'ETag' not in response, (
+                'Проверьте, что ответ с реплики не получает ETag'
+            )
+        assert 'Title' in replica_reads
+        client.cookies[settings.DATABASE_STICKY['COOKIE']] = '1'
+        etag = client.get(url)['ETag']
+        client.cookies.clear()
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что ответ из основной базы кэшируется и отдаётся '
+            'читателям реплик'
+        )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        with override_settings(CATALOGUE_CACHE=dict(
+                settings.CATALOGUE_CACHE, ENABLED=False)):
+            assert 'ETag' not in client.get(url)
+            client.cookies[settings.DATABASE_STICKY['COOKIE']] = '1'
+            etag = client.get(url)['ETag']
+            client.cookies.clear()
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code == 304
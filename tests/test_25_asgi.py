@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from api_yamdb.asgi import application
+from api_yamdb.asgi_handler import ASGIHandler, environ
+from .common import create_categories
+
+
+def request(method, path, body=b'', query_string=b'', headers=()):
+    """Выполняет запрос через ASGI-приложение, возвращает сообщения."""
+    incoming = [{'type': 'http.request', 'body': body[:1], 'more_body': True},
+                {'type': 'http.request', 'body': body[1:]}]
+    sent = []
+
+    async def receive():
+        # Медленный клиент: тело приходит по частям.
+        await asyncio.sleep(0)
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path,
+             'query_string': query_string, 'headers': list(headers)}
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+class Test25ASGI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_get(self, admin_client):
+        categories = create_categories(admin_client)
+        start, body = request('GET', '/api/v1/categories/',
+                              query_string=b'search=' + categories[0]['name'].encode())
+        assert start['status'] == 200
+        assert (b'content-type', b'application/json') in start['headers']
+        assert json.loads(body['body'])['results'] == [categories[0]], (
+            'Проверьте, что ASGI-приложение передаёт Django путь и параметры'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_post_body(self):
+        data = json.dumps({'username': 'asgi', 'email': 'asgi@yamdb.fake'})
+        start, body = request(
+            'POST', '/api/v1/auth/signup/', body=data.encode(),
+            headers=[(b'content-type', b'application/json')])
+        assert start['status'] == 200, (
+            'Проверьте, что тело запроса, полученное по частям, '
+            'передаётся Django целиком'
+        )
+        assert json.loads(body['body'])['username'] == 'asgi'
+
+    def test_03_disconnect(self):
+        sent = []
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(application(
+            {'type': 'http', 'method': 'GET', 'path': '/api/v1/'},
+            receive, send))
+        assert sent == []
+
+    def test_04_body_too_large(self):
+        handler = ASGIHandler(application.wsgi_application, 1, 4)
+        received = []
+        sent = []
+
+        async def receive():
+            received.append(None)
+            return {'type': 'http.request', 'body': b'abc', 'more_body': True}
+
+        async def send(message):
+            sent.append(message)
+
+        for headers in ([], [(b'content-length', b'100')]):
+            received.clear()
+            sent.clear()
+            asyncio.run(handler(
+                {'type': 'http', 'method': 'POST', 'path': '/api/v1/',
+                 'headers': headers}, receive, send))
+            assert sent[0]['status'] == 413, (
+                'Проверьте, что тело длиннее `max_body_size` '
+                'получает ответ 413'
+            )
+            assert len(received) <= 2, (
+                'Проверьте, что слишком длинное тело не дочитывается'
+            )
+
+    def test_05_repeated_cookies(self):
+        result = environ({'method': 'GET', 'path': '/', 'headers': [
+            (b'cookie', b'a=1'), (b'cookie', b'b=2'),
+            (b'accept', b'text/html'), (b'accept', b'*/*'),
+        ]}, b'')
+        assert result['HTTP_COOKIE'] == 'a=1; b=2', (
+            'Проверьте, что повторные заголовки Cookie склеиваются через "; "'
+        )
+        assert result['HTTP_ACCEPT'] == 'text/html,*/*'
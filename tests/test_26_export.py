@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from .common import create_comments, create_titles
+
+
+def read_ndjson(response):
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся через StreamingHttpResponse'
+    )
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(row) for row in content.splitlines()]
+
+
+class Test26Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_permissions(self, client, user_client, moderator_client):
+        for url in ('/api/v1/export/titles.ndjson',
+                    '/api/v1/export/reviews.ndjson'):
+            assert client.get(url).status_code == 401
+            assert user_client.get(url).status_code == 403
+            assert moderator_client.get(url).status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[0]['id']).update(rating=7.5)
+        with CaptureQueriesContext(connection) as context:
+            rows = read_ndjson(
+                admin_client.get('/api/v1/export/titles.ndjson'))
+        assert len(context.captured_queries) <= 6, (
+            'Проверьте, что выгрузка читает таблицы курсорами, '
+            'а не запросом на каждое произведение'
+        )
+        assert len(rows) == len(titles)
+        for row in rows:
+            expected = admin_client.get(f'/api/v1/titles/{row["id"]}/').json()
+            expected['genre'].sort(key=lambda genre: genre['slug'])
+            assert row == expected, (
+                'Проверьте, что произведения выгружаются в формате /titles/'
+            )
+        assert rows[0]['rating'] == 7
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_since(self, admin_client, admin):
+        create_comments(admin_client, admin)
+        reviews = list(Review.objects.order_by('-id').values(
+            'id', 'title_id'))
+        start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        for number, review in enumerate(reviews):
+            Review.objects.filter(pk=review['id']).update(
+                pub_date=start + timedelta(days=number))
+        rows = read_ndjson(admin_client.get('/api/v1/export/reviews.ndjson'))
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews]
+        assert rows[0]['title'] == reviews[0]['title_id']
+        assert rows[0]['author'] == Review.objects.get(
+            pk=rows[0]['id']).author.username
+        rows = read_ndjson(admin_client.get(
+            '/api/v1/export/reviews.ndjson',
+            {'since': '2021-01-02T00:00:00Z'}))
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews[1:]], (
+            'Проверьте, что `since` оставляет записи с pub_date >= since'
+        )
+        rows = read_ndjson(admin_client.get(
+            '/api/v1/export/comments.ndjson', {'since': '2000-01-01'}))
+        assert rows and {'id', 'title', 'review', 'text', 'author',
+                         'pub_date'} == set(rows[0])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bad_since(self, admin_client):
+        for url, since in (('reviews', 'вчера'), ('titles', '2021-01-01')):
+            response = admin_client.get(
+                f'/api/v1/export/{url}.ndjson', {'since': since})
+            assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_since_uses_index(self):
+        since = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        for model, index in ((Review, 'review_pub_date_idx'),
+                             (Comment, 'comment_pub_date_idx')):
+            plan = model.objects.order_by('pub_date', 'id').filter(
+                pub_date__gte=since).explain()
+            assert index in plan, (
+                'Проверьте, что выгрузка с `since=` читает '
+                f'{model.__name__} по индексу (pub_date, id)'
+            )